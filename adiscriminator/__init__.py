@@ -1,3 +1,22 @@
+import importlib
+
 from adiscriminator._version import __version__
-from adiscriminator import data
-from adiscriminator import logistic_regression
\ No newline at end of file
+
+# submodules are imported when first accessed (e.g. adiscriminator.data) so importing 
+# the package only imports numpy, pandas, scipy and sklearn are imported when data is
+# loaded or a model is fit
+submodules = ['data', 'logistic_regression']
+
+
+def __getattr__(name):
+
+    if name in submodules:
+
+        return importlib.import_module(f'adiscriminator.{name}')
+
+    raise AttributeError(f"module 'adiscriminator' has no attribute '{name}'")
+
+
+def __dir__():
+
+    return sorted(list(globals()) + submodules)
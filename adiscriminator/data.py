@@ -1,83 +1,421 @@
-import pandas as pd
-import numpy as np
+import json
+import os
 import os.path
+import shutil
+import tempfile
+import numpy as np
+
+# pandas is imported when data is loaded rather than with the package
+
+adult_url = 'https://archive.ics.uci.edu/ml/machine-learning-databases/adult/adult.data'
+
+adult_columns = ['age',
+                 'workclass',
+                 'fnlwgt',
+                 'education',
+                 'education_num',
+                 'marital_status',
+                 'occupation',
+                 'relationship',
+                 'race',
+                 'sex',
+                 'capital_gain',
+                 'capital_loss',
+                 'hours_per_week',
+                 'native_country',
+                 'income']
+
+# initially only keep the numeric columns
+numeric_columns = ['age',
+                   #'workclass',
+                   'fnlwgt',
+                   #'education',
+                   'education_num',
+                   #'marital_status',
+                   #'occupation',
+                   #'relationship',
+                   #'race',
+                   #'sex',
+                   'capital_gain',
+                   'capital_loss',
+                   'hours_per_week',
+                   #'native_country'
+                   ]
 
+# string columns one-hot encoded by data_to_sparse, education is left out as it is
+# the same as education_num
+categorical_columns = ['workclass',
+                       'marital_status',
+                       'occupation',
+                       'relationship',
+                       'race',
+                       'sex',
+                       'native_country']
+
+
+def get_cache_dir(cache_dir = None):
+
+    # the cache is kept in cache_dir, the ADISCRIMINATOR_CACHE environment variable or 
+    # ~/.cache/adiscriminator in that order, rather than the working directory
+    if cache_dir is None:
+
+        cache_dir = os.environ.get(
+            'ADISCRIMINATOR_CACHE', 
+            os.path.join(os.path.expanduser('~'), '.cache', 'adiscriminator')
+        )
+
+    return(os.path.join(os.fspath(cache_dir), 'adult'))
+
+
+def read_source(source = None, verbose = 0):
+
+    import pandas as pd
+
+    # a local copy of adult.data (read the same way as the download) or a pickled 
+    # DataFrame, the dataset is downloaded if source is None
+    if source is not None and os.fspath(source).endswith('.pkl'):
 
-def get_data(verbose = 0):
-    
-    file_path = 'adult.pkl'
-    
-    if os.path.exists(file_path):
-        
         if verbose > 0:
 
-            print('loading adult dataset from .pkl')
+            print(f'loading adult dataset from {source}')
 
-        data = pd.read_pickle(file_path)
+        return(pd.read_pickle(source))
 
-    else:
+    if source is None:
 
         if verbose > 0:
 
             print('downloading adult dataset from uci ml repository')
 
-        data_url = 'https://archive.ics.uci.edu/ml/machine-learning-databases/adult/adult.data'
-        
-        data = pd.read_csv(data_url)
-        
-        data.columns = ['age',
-                        'workclass',
-                        'fnlwgt',
-                        'education',
-                        'education_num',
-                        'marital_status',
-                        'occupation',
-                        'relationship',
-                        'race',
-                        'sex',
-                        'capital_gain',
-                        'capital_loss',
-                        'hours_per_week',
-                        'native_country',
-                        'income']
-        
-        data['income'] = (data['income'] == ' <=50K') * 1
+        source = adult_url
 
-        if verbose > 0:
+    elif verbose > 0:
 
-            print('saving adult dataset to .pkl')
+        print(f'loading adult dataset from {source}')
 
-        data.to_pickle(file_path)
+    data = pd.read_csv(source)
+
+    data.columns = adult_columns
+
+    data['income'] = (data['income'] == ' <=50K') * 1
 
     return(data)
 
 
-def data_to_np(data):
+def get_source_id(source = None):
 
-    # initially only keep the numeric columns
-    keep_cols = ['age',
-                 #'workclass',
-                 'fnlwgt',
-                 #'education',
-                 'education_num',
-                 #'marital_status',
-                 #'occupation',
-                 #'relationship',
-                 #'race',
-                 #'sex',
-                 'capital_gain',
-                 'capital_loss',
-                 'hours_per_week',
-                 #'native_country'
-                 ]
+    # identifies the source the cache was built from, a local file by its path, size 
+    # and modification time so the cache is rebuilt if the file changes
+    if source is None:
+
+        return({'path': adult_url})
+
+    path = os.fspath(source)
+
+    if not os.path.exists(path):
+
+        return({'path': path})
+
+    stat = os.stat(path)
+
+    return({'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+
+
+def write_cache(data, cache_path, source_id = None, verbose = 0):
+
+    # each column is saved to its own .npy file so columns can be loaded on their own
+    # and memory-mapped, string columns are saved as integer codes with the categories
+    # in metadata.json. Files are written to a temporary directory that is then renamed, 
+    # so other processes never see a partly written cache
+    if verbose > 0:
+
+        print(f'saving adult dataset to {cache_path}')
+
+    parent = os.path.dirname(cache_path)
+
+    os.makedirs(parent, exist_ok = True)
+
+    temp_path = tempfile.mkdtemp(dir = parent)
+
+    metadata = {'columns': list(data.columns), 'categories': {}, 'source': source_id}
+
+    for column in data.columns:
+
+        values = data[column]
+
+        if values.dtype.kind in 'biuf':
+
+            array = values.to_numpy()
+
+        else:
+
+            codes, categories = values.factorize()
+
+            array = codes.astype(np.int32)
+
+            metadata['categories'][column] = categories.tolist()
+
+        np.save(os.path.join(temp_path, f'{column}.npy'), array)
+
+    with open(os.path.join(temp_path, 'metadata.json'), 'w') as f:
+
+        json.dump(metadata, f)
+
+    # a cache from a different source is moved aside rather than deleted first, so 
+    # there is always a complete cache at cache_path
+    old_path = None
+
+    if os.path.exists(cache_path):
+
+        old_path = tempfile.mkdtemp(dir = parent)
+
+        os.rename(cache_path, os.path.join(old_path, 'adult'))
+
+    try:
+
+        os.rename(temp_path, cache_path)
+
+    except OSError:
+
+        # another process wrote the cache first
+        shutil.rmtree(temp_path)
+
+    if old_path is not None:
+
+        shutil.rmtree(old_path)
+
+
+def get_arrays(columns = None, cache_dir = None, source = None, mmap = True, verbose = 0):
+
+    # dict of 1d arrays for the columns (all if None) of the cached dataset, building the
+    # cache first if needed. With mmap the arrays are memory-mapped from the cache so 
+    # nothing is read until used and processes share the pages, string columns are 
+    # returned as integer codes, see get_categories. The cache is rebuilt if source is 
+    # given and is not the source the cache was built from (or has changed since), with
+    # source None any existing cache is used
+    cache_path = get_cache_dir(cache_dir)
+
+    metadata_path = os.path.join(cache_path, 'metadata.json')
+
+    source_id = get_source_id(source)
+
+    if not os.path.exists(metadata_path) or (source is not None and not get_metadata(cache_path).get('source') == source_id):
+
+        write_cache(read_source(source, verbose), cache_path, source_id, verbose)
+
+    elif verbose > 0:
+
+        print(f'loading adult dataset from {cache_path}')
+
+    metadata = get_metadata(cache_path)
+
+    if columns is None:
+
+        columns = metadata['columns']
+
+    missing = [column for column in columns if column not in metadata['columns']]
+
+    if len(missing) > 0:
+
+        raise KeyError(f'columns {missing} not in adult dataset')
+
+    return(
+        {
+            column: np.load(os.path.join(cache_path, f'{column}.npy'), mmap_mode = 'r' if mmap else None) 
+            for column in columns
+        }
+    )
+
+
+def get_metadata(cache_path):
 
-    X = np.array(data.loc[:, keep_cols])
+    with open(os.path.join(cache_path, 'metadata.json')) as f:
 
-    y = np.array(data.loc[:, 'income'])
+        return(json.load(f))
+
+
+def get_categories(cache_dir = None):
+
+    # categories of the string columns, indexed by the codes from get_arrays
+    return(get_metadata(get_cache_dir(cache_dir))['categories'])
+
+
+def get_data(verbose = 0, columns = None, cache_dir = None, source = None):
+
+    import pandas as pd
+
+    # DataFrame of the columns (all if None) of the adult dataset from the cache, see 
+    # get_arrays, with string columns as categoricals
+    arrays = get_arrays(columns, cache_dir = cache_dir, source = source, verbose = verbose)
+
+    categories = get_categories(cache_dir)
+
+    data = pd.DataFrame(
+        {
+            column: pd.Categorical.from_codes(values, categories[column]) if column in categories else values
+            for column, values in arrays.items()
+        }
+    )
+
+    return(data)
+
+
+def data_to_np(data):
+
+    # data can be a DataFrame from get_data or a dict of arrays from get_arrays, e.g. 
+    # get_arrays(numeric_columns + ['income']) to only load the columns that are kept
+    # columns are stacked as rows and transposed, so X is column-major (Fortran ordered)
+    # as np.array of a DataFrame is
+    X = np.array([np.asarray(data[column]) for column in numeric_columns]).T
+
+    y = np.array(data['income'])
 
     return(X, y)
 
 
+def fit_vocabularies(data, columns = categorical_columns):
+
+    import pandas as pd
+
+    # sorted unique values of each string column, missing values are left out
+    vocabularies = {}
+
+    for column in columns:
+
+        values = pd.Series(np.asarray(data[column], dtype = object)).dropna()
+
+        vocabularies[column] = sorted(values.unique().tolist())
+
+    return(vocabularies)
+
+
+def save_vocabularies(vocabularies, path):
+
+    with open(path, 'w') as f:
+
+        json.dump(vocabularies, f)
+
+
+def load_vocabularies(path):
+
+    with open(path) as f:
+
+        return(json.load(f))
+
+
+def sparse_feature_names(vocabularies, numeric = numeric_columns):
+
+    # names of the columns of X from data_to_sparse, the first value of each string 
+    # column is the reference level and has no column
+    names = list(numeric)
+
+    for column, vocabulary in vocabularies.items():
+
+        names += [f'{column}={value}' for value in vocabulary[1:]]
+
+    return(names)
+
+
+def data_to_sparse(data, vocabularies = None, group_columns = ('sex', ), numeric = numeric_columns):
+
+    import pandas as pd
+    import scipy.sparse as sp
+
+    # X as a CSR matrix of the numeric columns and a one-hot encoding of the string 
+    # columns in vocabularies (if None categorical_columns not in group_columns, with 
+    # vocabularies fit on data). Pass the vocabularies returned from fitting to encode 
+    # new data for scoring with the same columns, values not in a vocabulary are encoded 
+    # as the reference level. The group_columns are returned as the group for 
+    # GroupMeanEqualisingRegression (1d for one column, 2d for several) rather than 
+    # being put in X. Names of the columns of X are given by sparse_feature_names
+    if vocabularies is None:
+
+        vocabularies = fit_vocabularies(data, [column for column in categorical_columns if column not in group_columns])
+
+    m = len(data[(list(numeric) + list(vocabularies))[0]])
+
+    columns, values = [], []
+
+    for j, column in enumerate(numeric):
+
+        columns.append(np.full(m, j))
+
+        values.append(np.asarray(data[column], dtype = np.float64))
+
+    offset = len(numeric)
+
+    for column, vocabulary in vocabularies.items():
+
+        # codes index into the vocabulary, -1 for missing or unseen values
+        codes = pd.Index(vocabulary).get_indexer(np.asarray(data[column], dtype = object))
+
+        columns.append(offset + codes - 1)
+
+        values.append((codes > 0).astype(np.float64))
+
+        offset += len(vocabulary) - 1
+
+    # (m, k) arrays with an entry for every column of data in each row, zeros (including 
+    # reference levels) are dropped so each row's entries stay in column order
+    columns, values = np.column_stack(columns), np.column_stack(values)
+
+    nonzero = values != 0
+
+    indptr = np.concatenate([[0], np.cumsum(nonzero.sum(axis = 1))])
+
+    X = sp.csr_matrix((values[nonzero], columns[nonzero], indptr), shape = (m, offset))
+
+    y = np.array(data['income']) if 'income' in data else None
+
+    group = None
+
+    if len(group_columns) > 0:
+
+        group = np.column_stack([np.asarray(data[column], dtype = object) for column in group_columns])
+
+        if len(group_columns) == 1:
+
+            group = group[:, 0]
+
+    return(X, y, group, vocabularies)
+
+
+def deduplicate(X, y, group = None):
+
+    # collapse duplicated rows of X, y (and group) into the unique rows with the number 
+    # of times each occurs, fitting on the unique rows with the counts as sample_weight 
+    # gives the same coefficients as fitting on all the rows
+    y = np.asarray(y)
+
+    columns = [X[:, i] for i in range(X.shape[1])] + [y]
+
+    if group is not None:
+
+        group = np.asarray(group)
+
+        group_columns = group.reshape(len(y), -1)
+
+        columns += [group_columns[:, i] for i in range(group_columns.shape[1])]
+
+    # each column is replaced by integer codes so columns of any dtype (e.g. str group)
+    # can be compared together in np.unique
+    codes = np.column_stack([np.unique(column, return_inverse = True)[1].reshape(-1) for column in columns])
+
+    _, first_rows, counts = np.unique(codes, axis = 0, return_index = True, return_counts = True)
+
+    X_unique = X[first_rows]
+
+    y_unique = y[first_rows]
+
+    sample_weight = counts.astype(np.float64)
+
+    if group is None:
+
+        return(X_unique, y_unique, sample_weight)
+
+    return(X_unique, y_unique, group[first_rows], sample_weight)
+
+
 if __name__ == '__main__':
 
     adult = get_data()
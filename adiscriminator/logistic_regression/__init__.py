@@ -1,4 +1,18 @@
-from adiscriminator.logistic_regression import base
-from adiscriminator.logistic_regression import ridge
-from adiscriminator.logistic_regression import fair
+import importlib
 
+# submodules are imported when first accessed, see adiscriminator/__init__.py
+submodules = ['newton', 'scoring', 'base', 'ridge', 'fair', 'cross_validation', 'bootstrap']
+
+
+def __getattr__(name):
+
+    if name in submodules:
+
+        return importlib.import_module(f'adiscriminator.logistic_regression.{name}')
+
+    raise AttributeError(f"module 'adiscriminator.logistic_regression' has no attribute '{name}'")
+
+
+def __dir__():
+
+    return sorted(list(globals()) + submodules)
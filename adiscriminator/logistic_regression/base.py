@@ -1,130 +1,1245 @@
-import pandas as pd
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import numpy as np
-import scipy.optimize as op
-from sklearn.preprocessing import StandardScaler
 
+from adiscriminator.logistic_regression.newton import minimize_newton
+from adiscriminator.logistic_regression.scoring import Scorer
+
+# pandas, scipy and sklearn are imported in the methods that use them, so that importing
+# this module (e.g. to score with a fitted model) only imports numpy
+
+
+
+def issparse(X):
+    '''Function to check if X is a scipy.sparse matrix without importing scipy for other X.'''
+
+    if not type(X).__module__.startswith('scipy.sparse'):
+
+        return False
+
+    import scipy.sparse as sp
+
+    return sp.issparse(X)
+
+
+
+class StopOptimisation(Exception):
+    '''Exception raised in the optimiser's iteration callback to stop optimising early.
+
+    Parameters
+    ----------
+    theta : np.ndarray
+        Coefficient values at the iteration the optimisation was stopped.
+
+    J : float
+        Value of the cost function at theta.
+
+    grad : np.ndarray
+        Gradient of the cost function at theta.
+
+    '''
+
+    def __init__(self, theta, J, grad):
+
+        super().__init__('Optimisation stopped by callback.')
+
+        self.theta = theta
+        self.J = J
+        self.grad = grad
+
+
+
+
+def add_statistics(statistics, statistics_chunk):
+    '''Function to add penalty statistics for a chunk of rows to the running total.
+
+    Parameters
+    ----------
+    statistics : tuple or None
+        Running total of statistics, None if no chunks have been added yet.
+
+    statistics_chunk : tuple or None
+        Statistics for a chunk of rows, as returned by penalty_statistics.
+
+    '''
+
+    if statistics is None:
+
+        return statistics_chunk
+
+    return tuple(total + chunk for total, chunk in zip(statistics, statistics_chunk))
 
 
 class LogisticRegression():
     """Base logistic regression class.
 
-    Implements logisitic regression without any regularisation. Other implementations
-    with regularisation inherit from this class.
+    Implements logisitic regression without any regularisation. Other implementations
+    with regularisation inherit from this class.
+
+    Parameters
+    ----------
+    fit_intercept : bool, default = True
+        Should an intercept be included in the model?
+
+    standardise : bool, default = True
+        Should the inputs be standardised with sklearn's StandardScaler before fitting the model?
+
+    solver : str, default = 'tnc'
+        Optimisation method used to fit the model. Either 'tnc' to use scipy's truncated 
+        Newton (TNC) algorithm with the gradient only, or 'newton' to use exact Newton (IRLS) 
+        steps with the analytic Hessian, see newton.minimize_newton. 'newton' typically 
+        converges in far fewer iterations when the number of coefficients is small.
+
+    chunk_size : int or None, default = None
+        Number of rows of X processed at a time when calculating the cost, gradient and
+        Hessian in fit. If None all rows are processed at once. Setting chunk_size bounds 
+        the memory used for intermediate arrays to a multiple of chunk_size rows, so with 
+        X as a np.memmap or .npy file (see fit) the model can be fit on data that does not 
+        fit in memory. The coefficients are the same whatever the chunk_size.
+
+    n_jobs : int, default = 1
+        Number of threads used to process chunks of rows in parallel, -1 to use all cpus. 
+        If chunk_size is None the rows are split into n_jobs chunks. Chunk results are 
+        summed in row order, so for a given chunk_size results do not depend on n_jobs or 
+        thread scheduling.
+
+    dtype : np.float64 or np.float32, default = np.float64
+        Floating point type that X is held in and the linear predictor, predictions and 
+        products with X are calculated in. np.float32 halves the memory and memory bandwidth
+        used for X, sums over rows (the cost, the gradient and Hessian corrections for 
+        standardisation and sums across chunks) are still accumulated in float64 and the 
+        coefficients are optimised in float64. The 'tnc' solver differences the gradient, 
+        which float32 is not precise enough for, so with 'tnc' rows of float32 X are cast 
+        to float64 a chunk at a time instead (see chunk_dtype).
+
+    standard_errors : bool, default = False
+        Should the covariance of the coefficients and their standard errors, z-scores and 
+        p-values be calculated in fit? See add_standard_errors.
+
+    """
+
+    solvers = ['tnc', 'newton']
+
+    predict_outputs = ['column', 'flat', 'sklearn']
+
+    # centring and scaling of X applied implicitly in the linear predictor, set in 
+    # fit if standardise is True, None means the step is not applied
+    x_mean = None
+    x_scale = None
+
+    # coefficients and optimiser state for fitting on mini-batches, see partial_fit
+    stream_state = None
+
+    # weights for each row set in fit, None means each row has weight 1
+    sample_weight = None
+
+    # largest number of rows of float32 X cast to float64 at a time in fit with the 'tnc'
+    # solver, see row_chunks
+    float32_chunk_size = 65536
+
+    # calls to the methods that are profiled (see profiled) are only recorded in 
+    # profile while fit is running
+    profiling = False
+    profile = None
+    profile_lock = threading.Lock()
+
+    # the last coefficients, cost and gradient from loss_and_grad and the number of 
+    # evaluations since optimise started
+    last_evaluation = None
+
+    # thread pool shared by the calls to map_chunks in optimise, see thread_pool
+    executor = None
+
+    def __init__(self, fit_intercept = True, standardise = True, solver = 'tnc', chunk_size = None, n_jobs = 1, dtype = np.float64, standard_errors = False):
+
+        if not type(fit_intercept) is bool:
+            
+            raise TypeError('fit_intercept must be bool')
+
+        if not type(standardise) is bool:
+            
+            raise TypeError('standardise must be bool')
+
+        if not solver in self.solvers:
+
+            raise ValueError(f'solver must be one of {self.solvers}')
+
+        if not chunk_size is None:
+
+            if not type(chunk_size) is int:
+
+                raise TypeError('chunk_size must be int or None')
+
+            if chunk_size < 1:
+
+                raise ValueError('chunk_size must be at least 1')
+
+        if not type(n_jobs) is int:
+
+            raise TypeError('n_jobs must be int')
+
+        if n_jobs < 1 and not n_jobs == -1:
+
+            raise ValueError('n_jobs must be at least 1 or -1')
+
+        if not np.dtype(dtype) in [np.float32, np.float64]:
+
+            raise ValueError('dtype must be np.float32 or np.float64')
+
+        if not type(standard_errors) is bool:
+            
+            raise TypeError('standard_errors must be bool')
+
+        self.fit_intercept = fit_intercept
+        self.standardise = standardise
+        self.solver = solver
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+        self.dtype = np.dtype(dtype)
+        self.standard_errors = standard_errors
+
+
+    def fit(self, X, y, sample_weight = None, callback = None):
+        """Function to fit model to given explanatory variables (X) and response variable (y).
+        
+        Function uses scipy.optimize.minimize to minimise self.cost_function, using
+        self.loss_and_grad to supply the cost and gradient together. If solver is 'newton'
+        self.hessian is also supplied.
+
+        The fit is profiled and the results are stored in the profile attribute, a dict with;
+            'calls' - the number of calls to loss_and_grad (the cost and gradient, evaluated
+                together), calculate_p, penalty and hessian
+            'time' - the cumulative time in seconds spent in those calls and in the stages of
+                fit; 'standardise', 'optimise', 'extract_coefficients' and 'standard_errors'. 
+                Times of nested calls are included in the time of the call they are made 
+                from, e.g. calculate_p in loss_and_grad. With n_jobs > 1 calls on different chunks 
+                overlap so their times can add up to more than the elapsed time.
+            'trace' - a list with a dict for each iteration of the optimiser of the iteration
+                number, the cost ('loss'), the norm of the gradient ('grad_norm') and the 
+                time since the optimisation started.
+
+        X is passed to the optimiser unmodified; the intercept is carried as a separate 
+        term in the linear predictor rather than a column of ones and standardisation is
+        applied to the coefficients rather than X (see linear_predictor). Only integer X 
+        is copied, once, to float (or chunk by chunk if chunk_size is set), as is float X
+        of a different precision to dtype.
+
+        Parameters
+        ----------
+        X : np.ndarray, np.memmap, scipy.sparse matrix or str
+            2d array of explanatory variables to fit model on. Sparse matrices are 
+            converted to CSR format if they are not CSR or CSC already. A str or path 
+            is taken to be a .npy file, which is memory-mapped rather than read into 
+            memory, use with chunk_size.
+
+        y : np.ndarray
+            1d array of response variable.
+
+        sample_weight : np.ndarray or None, default = None
+            1d array of weights for each row, e.g. the number of times each row occurs 
+            for deduplicated data (see data.deduplicate). The cost is the weighted average 
+            over rows and the standardisation uses weighted means and variances, so fitting 
+            on unique rows with their counts as weights gives the same coefficients as 
+            fitting on all rows. If None each row has weight 1.
+
+        callback : callable or None, default = None
+            Function called after each iteration of the optimiser with a dict of the 
+            iteration number, the coefficients ('theta'), the cost ('loss'), the norm of the
+            gradient ('grad_norm') and the time since the optimisation started, e.g. for 
+            logging. If it returns True the optimisation is stopped and the model is fit 
+            with the coefficients from that iteration, optimisation_results['success'] 
+            is then False.
+
+        """
+
+        self.profile = {'calls': {}, 'time': {}, 'trace': []}
+
+        self.profiling = True
+
+        try:
+
+            X = self.prepare_fit(X, sample_weight)
+
+            initial_theta = np.zeros(self.n)
+
+            with self.profiled('optimise'):
+
+                self.optimisation_results = self.optimise(X, y, initial_theta, callback)
+
+            with self.profiled('extract_coefficients'):
+
+                self.extract_coefficients(self.optimisation_results['x'])
+
+            if self.standard_errors:
+
+                with self.profiled('standard_errors'):
+
+                    self.add_standard_errors(X, y)
+
+        finally:
+
+            self.profiling = False
+
+        return self
+
+
+    def prepare_fit(self, X, sample_weight = None):
+        """Function to prepare X and set the attributes that depend on X before fitting.
+
+        Sets m, n, coefficient_names, sample_weight and the standardisation (x_mean and x_scale).
+        Any mini-batch state from partial_fit is discarded, so partial_fit after fit starts 
+        again rather than continuing from the batches before fit.
+
+        Parameters
+        ----------
+        X : np.ndarray, np.memmap, scipy.sparse matrix or str
+            2d array of explanatory variables to fit model on, see fit.
+
+        sample_weight : np.ndarray or None, default = None
+            1d array of weights for each row, see fit.
+
+        Returns
+        -------
+        X : np.ndarray, np.memmap or scipy.sparse matrix
+            X prepared with prepare_X.
+
+        """
+
+        from sklearn.preprocessing import StandardScaler
+
+        X = self.prepare_X(X)
+
+        self.m = X.shape[0]
+
+        self.stream_state = None
+
+        self.sample_weight = None
+
+        if sample_weight is not None:
+
+            sample_weight = np.asarray(sample_weight, dtype = np.float64)
+
+            if not sample_weight.shape == (self.m, ):
+
+                raise ValueError('sample_weight must be a 1d array the same length as X')
+
+            self.sample_weight = sample_weight
+
+            self.sample_weight_total = np.sum(sample_weight)
+
+        self.coefficient_names = [f'x{i}' for i in range(1, X.shape[1] + 1)]
+
+        self.x_mean = None
+
+        self.x_scale = None
+
+        if self.standardise:
+
+            # centring sparse X would make it dense so StandardScaler is only used to
+            # calculate the mean and scale of the columns
+            self.scaler = StandardScaler(with_mean = not issparse(X))
+
+            # column means and variances are accumulated over the same chunks of rows
+            # as the cost and gradient, StandardScaler only takes sample_weight from 
+            # scikit-learn 0.24 so it is not passed for unweighted fits
+            with self.profiled('standardise'):
+
+                for rows in self.row_chunks():
+
+                    if self.sample_weight is None:
+
+                        self.scaler.partial_fit(self.get_chunk(X, rows))
+
+                    else:
+
+                        self.scaler.partial_fit(self.get_chunk(X, rows), sample_weight = self.chunk_weights(rows))
+
+            # X is not transformed, instead the standardisation is folded into the 
+            # coefficients in the linear predictor so no standardised copy of X is made
+            self.x_mean = self.scaler.mean_
+
+            self.x_scale = self.scaler.scale_
+
+        if self.fit_intercept:
+
+            self.coefficient_names = ['intercept'] + self.coefficient_names
+
+        self.n = len(self.coefficient_names)
+
+        return X
+
+
+    def optimise(self, X, y, initial_theta, callback = None):
+        """Function to minimise the cost from given initial coefficients with the chosen solver.
+
+        prepare_fit must have been called on X first. If fit is running or a callback is 
+        given, the cost and gradient norm are found for each iteration (see fit).
+
+        Parameters
+        ----------
+        X : np.ndarray, np.memmap or scipy.sparse matrix
+            2d array of explanatory variables returned from prepare_fit.
+
+        y : np.ndarray
+            1d array of response variable.
+
+        initial_theta : np.ndarray
+            Coefficient values to start the optimisation from.
+
+        callback : callable or None, default = None
+            Function called after each iteration, see fit.
+
+        Returns
+        -------
+        optimisation_results : scipy.optimize.OptimizeResult
+            Results from the optimiser.
+
+        """
+
+        import scipy.optimize as op
+
+        start = time.perf_counter()
+
+        self.last_evaluation = None
+
+        iterations = []
+
+        def record_iteration(theta):
+
+            # the last cost and gradient evaluated by the optimiser are usually at the 
+            # coefficients for the iteration so they need not be recalculated
+            if np.array_equal(theta, self.last_evaluation['theta']):
+
+                J, grad = self.last_evaluation['J'], self.last_evaluation['grad']
+
+            else:
+
+                J, grad = self.loss_and_grad(theta, X, y)
+
+            info = {
+                'iteration': len(iterations) + 1,
+                'loss': J,
+                'grad_norm': np.linalg.norm(grad),
+                'time': time.perf_counter() - start
+            }
+
+            iterations.append(info)
+
+            if self.profiling:
+
+                self.profile['trace'].append(info)
+
+            if callback is not None and callback({**info, 'theta': theta.copy()}):
+
+                raise StopOptimisation(theta.copy(), J, grad)
+
+        # iterations are only recorded when they are profiled or passed to callback
+        iteration_callback = record_iteration if self.profiling or callback is not None else None
+
+        # using optimiser suggested by stackoverflow user chammu;
+        # https://stackoverflow.com/questions/18801002/fminunc-alternate-in-numpy
+        # cost and gradient are evaluated together by loss_and_grad so that
+        # predictions are only calculated once per iteration
+        try:
+
+            with self.thread_pool():
+
+                if self.solver == 'newton':
+
+                    optimisation_results = minimize_newton(
+                        fun = self.loss_and_grad, 
+                        x0 = initial_theta, 
+                        args = (X, y),
+                        hess = self.hessian,
+                        callback = iteration_callback
+                    )
+
+                else:
+
+                    optimisation_results = op.minimize(
+                        fun = self.loss_and_grad, 
+                        x0 = initial_theta, 
+                        args = (X, y),
+                        method = 'TNC',
+                        jac = True,
+                        callback = iteration_callback
+                    )
+
+        except StopOptimisation as stop:
+
+            optimisation_results = op.OptimizeResult(
+                x = stop.theta,
+                fun = stop.J,
+                jac = stop.grad,
+                nit = len(iterations),
+                nfev = self.last_evaluation['count'],
+                status = -1,
+                success = False,
+                message = str(stop)
+            )
+
+        return optimisation_results
+
+
+    @contextmanager
+    def profiled(self, name):
+        '''Context manager to record a call to name and the time spent in it in profile, while fit is running.
+
+        Parameters
+        ----------
+        name : str
+            Name of the method or stage of fit being profiled.
+
+        '''
+
+        if not self.profiling:
+
+            yield
+
+            return
+
+        start = time.perf_counter()
+
+        try:
+
+            yield
+
+        finally:
+
+            elapsed = time.perf_counter() - start
+
+            # chunks may be processed in several threads at once
+            with self.profile_lock:
+
+                calls, times = self.profile['calls'], self.profile['time']
+
+                calls[name] = calls.get(name, 0) + 1
+
+                times[name] = times.get(name, 0) + elapsed
+
+
+    def partial_fit(self, X, y, learning_rate = 0.01):
+        """Function to update the model with one mini-batch of explanatory variables (X) and response (y).
+
+        One Adam step is taken using the gradient from self.loss_and_grad on the batch, so
+        the model can be fit on data too large for memory by calling partial_fit on 
+        successive batches (see fit_stream). The first call starts from zero coefficients, 
+        later calls continue from the previous batch.
+
+        If standardise is True the column means and scales are running estimates that are 
+        updated with each batch (StandardScaler.partial_fit). Any penalty is calculated for 
+        the batch alone, so for RidgeRegression lambda_ is relative to the batch size rather 
+        than the total number of rows.
+
+        Parameters
+        ----------
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables for the batch.
+
+        y : np.ndarray
+            1d array of response variable for the batch.
+
+        learning_rate : float, default = 0.01
+            Step size for the Adam update.
+
+        """
+
+        from sklearn.preprocessing import StandardScaler
+
+        # exponential decay rates for the moment estimates and constant for numerical 
+        # stability, as recommended in Kingma & Ba (2014) Adam: A Method for Stochastic Optimization
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+
+        X = self.prepare_X(X)
+
+        self.sample_weight = None
+
+        if self.stream_state is None:
+
+            self.coefficient_names = [f'x{i}' for i in range(1, X.shape[1] + 1)]
+
+            self.x_mean = None
+
+            self.x_scale = None
+
+            if self.standardise:
+
+                self.scaler = StandardScaler(with_mean = not issparse(X))
+
+            if self.fit_intercept:
+
+                self.coefficient_names = ['intercept'] + self.coefficient_names
+
+            self.n = len(self.coefficient_names)
+
+            self.stream_state = {
+                'theta': np.zeros(self.n),
+                'first_moment': np.zeros(self.n),
+                'second_moment': np.zeros(self.n),
+                'iterations': 0,
+                'rows': 0
+            }
+
+        if self.standardise:
+
+            self.scaler.partial_fit(X)
+
+            self.x_mean = self.scaler.mean_
+
+            self.x_scale = self.scaler.scale_
+
+        self.m = X.shape[0]
+
+        state = self.stream_state
+
+        J, grad = self.loss_and_grad(state['theta'], X, y)
+
+        state['iterations'] += 1
+
+        state['rows'] += self.m
+
+        state['first_moment'] = beta1 * state['first_moment'] + (1 - beta1) * grad
+
+        state['second_moment'] = beta2 * state['second_moment'] + (1 - beta2) * grad ** 2
+
+        first_moment_hat = state['first_moment'] / (1 - beta1 ** state['iterations'])
+
+        second_moment_hat = state['second_moment'] / (1 - beta2 ** state['iterations'])
+
+        state['theta'] = state['theta'] - learning_rate * first_moment_hat / (np.sqrt(second_moment_hat) + epsilon)
+
+        state['cost'] = J
+
+        self.extract_coefficients(state['theta'])
+
+        return self
+
+
+    def fit_stream(self, batches, **kwargs):
+        """Function to fit the model on an iterable of mini-batches with partial_fit.
+
+        Any previous mini-batch state is discarded so fitting starts from zero coefficients. 
+        Batches are consumed one at a time so they can be read lazily, e.g. chunk by chunk 
+        from disk.
+
+        Parameters
+        ----------
+        batches : iterable
+            Iterable of tuples of arguments to partial_fit, (X, y) for LogisticRegression 
+            and RidgeRegression and (X, y, group) for GroupMeanEqualisingRegression.
+
+        **kwargs
+            Other keyword arguments passed to partial_fit, e.g. learning_rate.
+
+        """
+
+        self.stream_state = None
+
+        for batch in batches:
+
+            self.partial_fit(*batch, **kwargs)
+
+        return self
+
+
+    def prepare_X(self, X):
+        """Function to convert X to a format that can be used directly in fitting.
+
+        A str or path is loaded as a memory-mapped .npy file. Other X that is not a np.ndarray 
+        (or np.memmap) or sparse matrix, e.g. a pd.DataFrame, is converted with np.asarray. 
+        Sparse matrices are converted to CSR format if they are not CSR or CSC already, or 
+        if they are CSC and rows will be sliced into chunks (chunk_size set, more than one 
+        thread or chunks cast to float64, see row_chunks), as slicing rows of CSC is slow.
+        X that is not of type dtype is cast to dtype once, as it would otherwise be cast in 
+        every X.dot call in the optimiser. If chunk_size is set the cast is left to get_chunk so that only one chunk is copied
+        at a time. Other X is returned without copying.
+
+        Parameters
+        ----------
+        X : np.ndarray, np.memmap, scipy.sparse matrix, pd.DataFrame or str
+            2d array of explanatory variables.
+
+        """
+
+        if isinstance(X, (str, os.PathLike)):
+
+            X = np.load(X, mmap_mode = 'r')
+
+        elif not isinstance(X, np.ndarray) and not issparse(X):
+
+            X = np.asarray(X)
+
+        slices_rows = self.chunk_size is not None or self.get_n_threads() > 1 or not self.chunk_dtype() == self.dtype
+
+        if issparse(X) and (not X.format in ['csr', 'csc'] or (X.format == 'csc' and slices_rows)):
+
+            X = X.tocsr()
+
+        if self.chunk_size is None and not X.dtype == self.dtype:
+
+            X = X.astype(self.dtype)
+
+        return X
+
+
+    def extract_coefficients(self, theta):
+        """Function to extract the coefficients (theta) from optimisation into a table.
+
+        The coefficients table is stored in the coefficients attribute. If standardise 
+        is True the table contains the coefficients on the standardised scale (std_coef)
+        and on the original scale of X (coef), otherwise only coef.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values from the optimiser.
+
+        """
+
+        import pandas as pd
+
+        if self.standardise:
+
+            self.coefficients = pd.DataFrame(
+                {
+                    'name': self.coefficient_names,
+                    'std_coef': theta
+                }
+            )
+
+            if self.fit_intercept:
+
+                # formula for non standardised intercept term; 
+                # b'0 = b0 - sum j [xbarj * bj / sj]
+                # b'0 is the non standardised intercept
+                # b0 is the standardised intercept
+                # bj is the jth standardised coefficient
+                # sj is the std for the jth variable
+                # xbarj is the mean for jth variable
+                non_std_intercept = theta[0] - \
+                    sum((np.array(theta[1:]) * np.array(self.x_mean)) / np.array(self.x_scale))
+
+                # divide standardised coefficients by scaling factors
+                non_std_coefs = theta[1:] / self.x_scale
+
+                non_std_coefs = [non_std_intercept] + non_std_coefs.tolist()
+
+            else:
+
+                non_std_coefs = theta / self.x_scale
+
+                non_std_coefs = non_std_coefs.tolist()
+
+            self.coefficients['coef'] = non_std_coefs
+
+        else:
+
+            self.coefficients = pd.DataFrame(
+                {
+                    'name': self.coefficient_names,
+                    'coef': theta
+                }
+            )
+
+
+    def add_standard_errors(self, X, y):
+        """Function to calculate the covariance of the fitted coefficients and add their standard errors to the coefficients table.
+
+        The covariance is the inverse of the observed information, the Hessian of the cost
+        at the fitted coefficients (see hessian) times the total weight of the rows, as the
+        cost is the average over rows. This takes one chunked pass over X, or none with the
+        'newton' solver as the Hessian at the optimum is kept from its last iteration. For 
+        penalised models the Hessian includes the penalty's (see penalty_hessian), so the 
+        standard errors are those of the penalised estimates (for the group mean difference 
+        penalty with its Gauss-Newton approximation).
+
+        The covariance on the scale of X is found from the covariance of the standardised 
+        coefficients with the linear map from standardised to unstandardised coefficients
+        (see extract_coefficients). The covariance attribute holds the covariance on the 
+        scale of X and columns se, z and p_value (two-sided, from the normal distribution) 
+        are added to the coefficients table, as well as std_se if standardise is True.
+
+        Parameters
+        ----------
+        X : np.ndarray, np.memmap or scipy.sparse matrix
+            2d array of explanatory variables returned from prepare_fit.
+
+        y : np.ndarray
+            1d array of response variable.
+
+        """
+
+        from scipy.special import erfc
+
+        theta = self.optimisation_results['x']
+
+        if self.solver == 'newton' and self.optimisation_results['status'] == 0:
+
+            H = self.optimisation_results['hess']
+
+        else:
+
+            H = self.hessian(theta, X, y)
+
+        std_covariance = np.linalg.pinv(H * self.weight_total())
+
+        # jacobian of the coefficients on the scale of X w.r.t. the standardised coefficients
+        jacobian = np.eye(self.n)
+
+        if self.x_scale is not None:
+
+            offset = 1 if self.fit_intercept else 0
+
+            jacobian[offset:, offset:] = np.diag(1 / self.x_scale)
+
+            if self.fit_intercept:
+
+                jacobian[0, 1:] = -self.x_mean / self.x_scale
+
+        self.covariance = jacobian.dot(std_covariance).dot(jacobian.T)
+
+        if self.standardise:
+
+            self.coefficients['std_se'] = np.sqrt(np.diag(std_covariance))
+
+        self.coefficients['se'] = np.sqrt(np.diag(self.covariance))
+
+        self.coefficients['z'] = self.coefficients['coef'] / self.coefficients['se']
+
+        self.coefficients['p_value'] = erfc(np.abs(self.coefficients['z'].to_numpy()) / np.sqrt(2))
+
+
+    def loss_and_grad(self, theta, X, y):
+        '''Calculate the cost and the gradient of the cost w.r.t. theta together.
+
+        Predictions are calculated once and shared between the cost, the gradient and
+        any penalty term, rather than being recalculated for each. This is the function
+        passed to scipy.optimize.minimize (with jac = True) in fit.
+
+        The rows of X are processed in chunks of chunk_size rows (see chunk_loss_and_grad)
+        and the sums of the cost, gradient and penalty statistics are accumulated over 
+        chunks, so only one chunk's temporaries are held in memory at a time. The result 
+        is the same as processing all rows at once.
+        
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        X : np.ndarray
+            2d array of explanatory variables to fit model on.
+
+        y : np.ndarray
+            1d array of response variable.
+
+        Returns
+        -------
+        J : float
+            Value of the cost function.
+
+        grad : np.ndarray
+            1d array of the gradient of the cost function w.r.t. each element of theta.
+
+        '''
+
+        with self.profiled('loss_and_grad'):
+
+            y = y.reshape(self.m)
+
+            J, grad, statistics = 0, 0, None
+
+            for J_chunk, grad_chunk, statistics_chunk in self.map_chunks(self.chunk_loss_and_grad, theta, X, y):
+
+                J = J + J_chunk
+
+                grad = grad + grad_chunk
+
+                statistics = add_statistics(statistics, statistics_chunk)
+
+            J = J / self.weight_total()
+
+            grad = grad / self.weight_total()
+
+            with self.profiled('penalty'):
+
+                penalty, grad_penalty = self.penalty(theta, statistics)
+
+            J = J + penalty
+
+            grad = grad + grad_penalty
+
+        # kept for the iteration callback in optimise
+        count = 1 if self.last_evaluation is None else self.last_evaluation['count'] + 1
+
+        self.last_evaluation = {'theta': theta.copy(), 'J': J, 'grad': grad, 'count': count}
+
+        return J, grad
+
+
+    def chunk_loss_and_grad(self, theta, X, y, rows):
+        '''Calculate the sums of the cost and gradient, and any penalty statistics, over some rows of X.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        X : np.ndarray
+            2d array of explanatory variables to fit model on.
+
+        y : np.ndarray
+            1d array of response variable.
+
+        rows : slice
+            Rows of X and y to use.
+
+        '''
+
+        X = self.get_chunk(X, rows)
+
+        y = y[rows]
+
+        z = self.linear_predictor(theta, X)
+
+        # the cost is calculated from the linear predictor (z) rather than p, using
+        # -y * log(p) - (1 - y) * log(1 - p) = log(1 + exp(z)) - y * z
+        # where log(1 + exp(z)) is calculated with np.logaddexp so it does not overflow 
+        p = np.logaddexp(0, z)
+
+        w = self.chunk_weights(rows)
+
+        if w is None:
+
+            J = np.sum(p, dtype = np.float64) - y.dot(z)
+
+        else:
+
+            J = w.dot(p) - (w * y).dot(z)
+
+        # p = sigmoid(z) = exp(z - log(1 + exp(z))), calculated in place
+        np.subtract(z, p, out = p)
+
+        np.exp(p, out = p)
+
+        # z is no longer needed so is reused for the residuals
+        residuals = np.subtract(p, y, out = z)
+
+        if w is not None:
+
+            residuals *= w
+
+        grad = self.transpose_dot(X, residuals)
+
+        statistics = self.penalty_statistics(theta, X, p, rows)
+
+        return J, grad, statistics
+
+
+    def penalty_statistics(self, theta, X, p, rows):
+        '''Calculate the statistics needed for the penalty term from some rows of X.
+
+        Statistics must be sums over rows (as a tuple of arrays) so they can be accumulated
+        over chunks of rows. There is no penalty for the base class, subclasses with 
+        penalties that depend on the data override this method.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        X : np.ndarray
+            2d array of explanatory variables for the rows.
+
+        p : np.ndarray
+            1d array of predictions for the current theta for the rows.
+
+        rows : slice
+            Rows of the full data that X and p correspond to.
+
+        '''
+
+        return None
+
+
+    def penalty(self, theta, statistics):
+        '''Calculate the penalty term added to the cost and its gradient w.r.t. theta.
+
+        There is no penalty for the base class, subclasses with regularisation override
+        this method.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        statistics : tuple or None
+            Penalty statistics summed over all rows, see penalty_statistics.
+
+        '''
+
+        return 0, 0
+
+
+    def hessian(self, theta, X, y):
+        '''Calculate the Hessian of the cost function w.r.t. theta.
+
+        For the unpenalised cost this is X.T diag(p(1 - p)) X / m, any penalty term's 
+        Hessian is added by penalty_hessian. Rows are processed in chunks as in loss_and_grad.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        X : np.ndarray
+            2d array of explanatory variables to fit model on.
+
+        y : np.ndarray
+            1d array of response variable.
+
+        '''
+
+        with self.profiled('hessian'):
+
+            H, statistics = 0, None
+
+            for H_chunk, statistics_chunk in self.map_chunks(self.chunk_hessian, theta, X):
+
+                H = H + H_chunk
+
+                statistics = add_statistics(statistics, statistics_chunk)
+
+            H = H / self.weight_total()
+
+            H = H + self.penalty_hessian(theta, statistics)
+
+        return H
+
+
+    def chunk_hessian(self, theta, X, rows):
+        '''Calculate the sum of X.T diag(p(1 - p)) X, and any penalty statistics, over some rows of X.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        X : np.ndarray
+            2d array of explanatory variables to fit model on.
+
+        rows : slice
+            Rows of X to use.
+
+        '''
+
+        X = self.get_chunk(X, rows)
+
+        p = self.calculate_p(theta, X)[:, 0]
+
+        w = p * (1 - p)
+
+        if self.sample_weight is not None:
+
+            w *= self.chunk_weights(rows)
+
+        H = self.weighted_crossproduct(X, w)
+
+        statistics = self.penalty_statistics(theta, X, p, rows)
+
+        return H, statistics
+
+
+    def penalty_hessian(self, theta, statistics):
+        '''Calculate the Hessian of the penalty term w.r.t. theta.
+
+        There is no penalty for the base class, subclasses with regularisation override
+        this method.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        statistics : tuple or None
+            Penalty statistics summed over all rows, see penalty_statistics.
+
+        '''
+
+        return 0
+
+
+    def row_chunks(self):
+        '''Return slices for the chunks of chunk_size rows that are processed at a time.
+
+        If chunk_size is None rows are split into one chunk per thread (see n_jobs). If 
+        chunks are cast from dtype to float64 (see chunk_dtype) they have at most 
+        float32_chunk_size rows. A single slice covering all rows is returned if the 
+        chunk size is not less than the number of rows (m).
+        '''
+
+        chunk_size = self.chunk_size
+
+        if chunk_size is None:
+
+            chunk_size = -(-self.m // self.get_n_threads())
+
+        if not self.chunk_dtype() == self.dtype:
+
+            chunk_size = min(chunk_size, self.float32_chunk_size)
+
+        if chunk_size >= self.m:
+
+            return [slice(None)]
+
+        return [slice(start, min(start + chunk_size, self.m)) for start in range(0, self.m, chunk_size)]
+
+
+    def map_chunks(self, function, *args):
+        '''Apply function to each chunk of rows, on a thread pool if n_jobs is not 1.
+
+        function is called as function(*args, rows) for each slice from row_chunks. Results 
+        are returned in the order of the chunks, whichever thread finishes first, so sums 
+        over the results are the same from run to run.
+
+        Parameters
+        ----------
+        function : callable
+            Function to apply, e.g. chunk_loss_and_grad.
+
+        *args
+            Arguments passed to function before the rows.
+
+        '''
+
+        chunks = self.row_chunks()
+
+        n_threads = min(self.get_n_threads(), len(chunks))
+
+        if n_threads == 1:
 
-    Parameters
-    ----------
-    fit_intercept : bool, default = True
-        Should an intercept be included in the model?
+            return [function(*args, rows) for rows in chunks]
 
-    standardise : bool, default = True
-        Should the inputs be standardised with sklearn's StandardScaler before fitting the model?
+        # numpy releases the GIL in the elementwise operations and matrix products that 
+        # dominate each chunk, so threads run in parallel without copying X
+        if self.executor is not None:
 
-    """
+            return list(self.executor.map(lambda rows: function(*args, rows), chunks))
 
-    def __init__(self, fit_intercept = True, standardise = True):
+        with ThreadPoolExecutor(max_workers = n_threads) as executor:
 
-        if not type(fit_intercept) is bool:
-            
-            raise TypeError('fit_intercept must be bool')
+            return list(executor.map(lambda rows: function(*args, rows), chunks))
 
-        if not type(standardise) is bool:
-            
-            raise TypeError('standardise must be bool')
 
-        self.fit_intercept = fit_intercept
-        self.standardise = standardise
+    @contextmanager
+    def thread_pool(self):
+        '''Context manager to keep one thread pool for the calls to map_chunks in the block.
 
+        Starting threads costs more than the work in a cost and gradient evaluation for 
+        small X, so optimise uses one pool for all evaluations rather than map_chunks 
+        starting a pool for each. Nothing is done with one thread or if a pool is already 
+        open, the pool is shut down at the end of the block.
+        '''
 
-    def fit(self, X, y):
-        """Function to fit model to given explanatory variables (X) and response variable (y).
-        
-        Function uses scipy.optimize.minimize to minimise self.cost_function.
+        if self.executor is not None or self.get_n_threads() == 1:
 
-        Parameters
-        ----------
-        X : np.ndarray
-            2d array of explanatory variables to fit model on.
+            yield
 
-        y : np.ndarray
-            1d array of response variable.
+            return
 
-        """
+        self.executor = ThreadPoolExecutor(max_workers = self.get_n_threads())
 
-        self.coefficient_names = [f'x{i}' for i in range(1, X.shape[1] + 1)]
+        try:
 
-        if self.standardise:
+            yield
 
-            self.scaler = StandardScaler()
+        finally:
 
-            self.scaler.fit(X)
+            self.executor.shutdown()
 
-            X = self.scaler.transform(X)
+            self.executor = None
 
-        if self.fit_intercept:
 
-            self.coefficient_names = ['intercept'] + self.coefficient_names
+    def get_n_threads(self):
+        '''Return the number of threads to use, n_jobs = -1 means one per cpu.'''
 
-            X = np.hstack([np.ones((X.shape[0], 1)), X])
+        if self.n_jobs == -1:
 
-        self.m, self.n = X.shape
+            return os.cpu_count() or 1
 
-        initial_theta = np.zeros(self.n)
+        return self.n_jobs
 
-        # using optimiser suggested by stackoverflow user chammu;
-        # https://stackoverflow.com/questions/18801002/fminunc-alternate-in-numpy
-        self.optimisation_results = op.minimize(
-            fun = self.cost_function, 
-            x0 = initial_theta, 
-            args = (X, y),
-            method = 'TNC',
-            jac = self.gradient
-        )
-
-        # extract coefficients into nice table
-        if self.standardise:
 
-            self.coefficients = pd.DataFrame(
-                {
-                    'name': self.coefficient_names,
-                    'std_coef': self.optimisation_results['x']
-                }
-            )
+    def chunk_weights(self, rows):
+        '''Return the sample weights for the given rows, None if there are no sample weights.'''
 
-            if self.fit_intercept:
+        if self.sample_weight is None:
 
-                # formula for non standardised intercept term; 
-                # b'0 = b0 - sum j [xbarj * bj / sj]
-                # b'0 is the non standardised intercept
-                # b0 is the standardised intercept
-                # bj is the jth standardised coefficient
-                # sj is the std for the jth variable
-                # xbarj is the mean for jth variable
-                non_std_intercept = self.optimisation_results['x'][0] - \
-                    sum((np.array(self.optimisation_results['x'][1:]) * np.array(self.scaler.mean_)) / np.array(self.scaler.scale_))
+            return None
 
-                # divide standardised coefficients by scaling factors
-                non_std_coefs = self.optimisation_results['x'][1:] / self.scaler.scale_
+        return self.sample_weight[rows]
 
-                non_std_coefs = [non_std_intercept] + non_std_coefs.tolist()
 
-            else:
+    def weight_total(self):
+        '''Return the total sample weight, the cost is the weighted average over rows.
 
-                non_std_coefs = self.optimisation_results['x'] / self.scaler.scale_
+        This is the number of rows (m) if there are no sample weights.
+        '''
 
-                non_std_coefs = non_std_coefs.tolist()
+        if self.sample_weight is None:
 
-            self.coefficients['coef'] = non_std_coefs
+            return self.m
 
-        else:
+        return self.sample_weight_total
 
-            self.coefficients = pd.DataFrame(
-                {
-                    'name': self.coefficient_names,
-                    'coef': self.optimisation_results['x']
-                }
-            )
 
-        return self
+    def chunk_dtype(self):
+        '''Return the floating point type chunks of X are cast to for the cost, gradient and Hessian.
+
+        This is dtype, except with dtype np.float32 and the 'tnc' solver. With X in float32 
+        the coefficients are rounded to float32 in the linear predictor and the products 
+        in transpose_dot are large before the centring is taken off (see linear_predictor), 
+        so the gradient is only precise to around 1e-7. That is enough for 'newton', but 
+        'tnc' differences the gradient over much smaller steps and does not converge, so 
+        for 'tnc' chunks are cast to float64.
+        '''
+
+        if self.solver == 'tnc':
+
+            return np.dtype(np.float64)
+
+        return self.dtype
+
+
+    def get_chunk(self, X, rows):
+        '''Return the given rows of X, cast to chunk_dtype if X is not of that type.
+
+        Slicing a np.ndarray or np.memmap returns a view, so only the rows in the chunk 
+        are read (and cast) at a time.
+
+        Parameters
+        ----------
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables.
+
+        rows : slice
+            Rows of X to return.
+
+        '''
+
+        if not rows == slice(None):
+
+            X = X[rows]
+
+        dtype = self.chunk_dtype()
+
+        if not X.dtype == dtype:
+
+            X = X.astype(dtype)
+
+        return X
 
 
     def cost_function(self, theta, X, y):
@@ -143,11 +1258,7 @@ class LogisticRegression():
 
         '''
 
-        y = y.reshape((self.m, 1))
-
-        p = self.calculate_p(theta, X)
-
-        J = np.sum((-y * np.log(p)) - ((1 - y) * np.log(1 - p))) / self.m
+        J, _ = self.loss_and_grad(theta, X, y)
 
         return J
 
@@ -168,13 +1279,191 @@ class LogisticRegression():
 
         '''
 
-        theta = theta.reshape((self.n, 1))
+        with self.profiled('calculate_p'):
+
+            x_dot_theta = self.linear_predictor(theta, X)
+
+            p = self.sigmoid(x_dot_theta)
+
+        return p.reshape((-1, 1))
+
+
+    def linear_predictor(self, theta, X):
+        '''Calculate the linear predictor for given coefficients (theta) and data (X).
+
+        If fit_intercept is True the first element of theta is the intercept, which is 
+        added to X.dot(theta[1:]) rather than adding a column of ones to X. If x_mean 
+        and x_scale are set (in fit) the centring and scaling of X are applied to 
+        theta instead of X, so X is never copied.
         
-        x_dot_theta = X.dot(theta)
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables.
+
+        '''
+
+        if self.fit_intercept:
+
+            intercept, coefs = theta[0], theta[1:]
+
+        else:
+
+            intercept, coefs = 0, theta
+
+        if self.x_scale is not None:
+
+            coefs = coefs / self.x_scale
+
+        if self.x_mean is not None:
+
+            intercept = intercept - self.x_mean.dot(coefs)
+
+        # coefs are cast to float32 for float32 X so X.dot does not upcast X
+        if X.dtype == np.float32:
+
+            coefs = coefs.astype(np.float32)
+
+        z = X.dot(coefs)
+
+        z += intercept
+
+        return z
+
+
+    def transpose_dot(self, X, v):
+        '''Calculate the product of the transpose of the design matrix and v.
+
+        The design matrix is X with any implicit centring and scaling applied and a 
+        column of ones prepended if fit_intercept is True, see linear_predictor.
+
+        Parameters
+        ----------
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables.
+
+        v : np.ndarray
+            1d array with length equal to the number of rows in X.
+
+        '''
+
+        product = np.asarray((X.T).dot(v), dtype = np.float64)
+
+        v_sum = np.sum(v, dtype = np.float64)
+
+        if self.x_mean is not None:
+
+            product = product - self.x_mean * v_sum
+
+        if self.x_scale is not None:
+
+            product = product / self.x_scale
+
+        if self.fit_intercept:
+
+            product = np.concatenate([[v_sum], product])
 
-        p = self.sigmoid(x_dot_theta)
+        return product
 
-        return p
+
+    def sparse_transpose_dot(self, V, X):
+        '''Calculate the product of the transpose of sparse V and the design matrix.
+
+        Equivalent to transpose_dot for each column of V, with the results as rows. Only 
+        the non-zero elements of V are multiplied, so the cost does not depend on the 
+        number of columns of V.
+
+        Parameters
+        ----------
+        V : scipy.sparse matrix
+            2d array with number of rows equal to the number of rows in X.
+
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables.
+
+        '''
+
+        product = V.T.dot(X)
+
+        if issparse(product):
+
+            product = product.toarray()
+
+        product = np.asarray(product, dtype = np.float64)
+
+        v_sums = np.asarray(V.sum(axis = 0, dtype = np.float64)).reshape(-1)
+
+        if self.x_mean is not None:
+
+            product = product - np.outer(v_sums, self.x_mean)
+
+        if self.x_scale is not None:
+
+            product = product / self.x_scale
+
+        if self.fit_intercept:
+
+            product = np.column_stack([v_sums, product])
+
+        return product
+
+
+    def weighted_crossproduct(self, X, w):
+        '''Calculate the design matrix transposed times diag(w) times the design matrix.
+
+        The design matrix is X with any implicit centring and scaling applied and a 
+        column of ones prepended if fit_intercept is True, see linear_predictor.
+
+        Parameters
+        ----------
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables.
+
+        w : np.ndarray
+            1d array of row weights with length equal to the number of rows in X.
+
+        '''
+
+        if issparse(X):
+
+            XtWX = (X.T).dot(X.multiply(w[:, np.newaxis])).toarray()
+
+        else:
+
+            XtWX = (X.T).dot(w[:, np.newaxis] * X)
+
+        XtWX = np.asarray(XtWX, dtype = np.float64)
+
+        Xtw = np.asarray((X.T).dot(w), dtype = np.float64)
+
+        w_sum = np.sum(w, dtype = np.float64)
+
+        if self.x_mean is not None:
+
+            XtWX = XtWX - np.outer(self.x_mean, Xtw) - np.outer(Xtw, self.x_mean) + \
+                w_sum * np.outer(self.x_mean, self.x_mean)
+
+            Xtw = Xtw - self.x_mean * w_sum
+
+        if self.x_scale is not None:
+
+            XtWX = XtWX / np.outer(self.x_scale, self.x_scale)
+
+            Xtw = Xtw / self.x_scale
+
+        if self.fit_intercept:
+
+            XtWX = np.block(
+                [
+                    [np.array([[w_sum]]), Xtw[np.newaxis, :]], 
+                    [Xtw[:, np.newaxis], XtWX]
+                ]
+            )
+
+        return XtWX
 
 
     def gradient(self, theta, X, y):
@@ -193,48 +1482,199 @@ class LogisticRegression():
         
         '''
         
-        theta = theta.reshape((self.n, 1))
-        
-        y = y.reshape((self.m, 1))
-
-        grad = (X.T).dot(self.calculate_p(theta, X) - y) / self.m
-
-        grad = grad.flatten()
+        _, grad = self.loss_and_grad(theta, X, y)
 
         return grad
 
 
     def sigmoid(self, z):
         '''Calculate the sigmoid of all elements of a np array.
+
+        Calculated as exp(z - log(1 + exp(z))) so that large values of |z| do not 
+        overflow. Only one array is allocated, the remaining operations are in place. 
+        float32 z is kept in float32, other z (e.g. int or a scalar) is converted to float64.
         
         Parameters
         ----------
-        z : np.ndarray
+        z : np.ndarray or float
             Array of values to transform.
 
         '''
+
+        z = np.asarray(z)
+
+        if not z.dtype in [np.float32, np.float64]:
+
+            z = z.astype(np.float64)
+
+        # 0-d results of ufuncs are scalars, which cannot be written to in place
+        if z.ndim == 0:
+
+            return np.exp(z - np.logaddexp(0, z))
         
-        g = 1 / (1 + np.exp(-z))
+        g = np.logaddexp(0, z)
+
+        np.subtract(z, g, out = g)
+
+        np.exp(g, out = g)
         
         return g
 
 
-    def predict_proba(self, X):
+    def predict_proba(self, X, batch_size = None, out = None, output = 'column'):
         """Function to return predictions from model for input data X.
+
+        Rows are scored in batches of batch_size rows, with the predictions for each batch
+        written directly into the output array, so the only temporary arrays are the size 
+        of one batch.
         
         Parameters
         ----------
-        X : np.ndarray
-            2d array of explanatory variables to predict for.        
+        X : np.ndarray, np.memmap, scipy.sparse matrix or str
+            2d array of explanatory variables to predict for. A str or path is taken to be
+            a .npy file, which is memory-mapped. Predictions are calculated in float32 if 
+            dtype is np.float32 and X is float32.
+
+        batch_size : int or None, default = None
+            Number of rows scored at a time. If None chunk_size is used and if that is also
+            None all rows are scored at once.
+
+        out : np.ndarray or None, default = None
+            Array to write the predictions into, with the shape given by output. If None a
+            new array is returned.
+
+        output : str, default = 'column'
+            Shape of the predictions; 'column' for a (m, 1) array, 'flat' for a 1d array or 
+            'sklearn' for a (m, 2) array with the probabilities of y = 0 and y = 1 in the 
+            columns, as returned by sklearn's predict_proba.
+
+        """
+
+        if not output in self.predict_outputs:
+
+            raise ValueError(f'output must be one of {self.predict_outputs}')
+
+        if not batch_size is None:
+
+            if not type(batch_size) is int:
+
+                raise TypeError('batch_size must be int or None')
+
+            if batch_size < 1:
+
+                raise ValueError('batch_size must be at least 1')
+
+        if isinstance(X, (str, os.PathLike)):
+
+            X = np.load(X, mmap_mode = 'r')
+
+        elif not isinstance(X, np.ndarray) and not issparse(X):
+
+            X = np.asarray(X)
+
+        m = X.shape[0]
+
+        if batch_size is None:
+
+            batch_size = m if self.chunk_size is None else self.chunk_size
+
+        # rows are sliced for each batch, which is slow for CSC
+        if issparse(X) and (not X.format in ['csr', 'csc'] or (X.format == 'csc' and batch_size < m)):
+
+            X = X.tocsr()
+
+        coefs = self.coefficients['coef'].to_numpy().astype(self.dtype, copy = False)
+
+        shape = {'column': (m, 1), 'flat': (m, ), 'sklearn': (m, 2)}[output]
+
+        if out is None:
+
+            out = np.empty(shape, dtype = np.result_type(X.dtype, coefs.dtype))
+
+        elif not out.shape == shape:
+
+            raise ValueError(f'out must have shape {shape}')
+
+        # predictions are written to a 1d view of out, the probability of y = 1 column for
+        # 'sklearn' output
+        predictions = out if output == 'flat' else out[:, -1]
+
+        for start in range(0, m, max(batch_size, 1)):
+
+            rows = slice(start, min(start + batch_size, m))
+
+            X_batch = X if batch_size >= m else X[rows]
+
+            if self.fit_intercept:
+
+                x_dot_theta = X_batch.dot(coefs[1:])
+
+                x_dot_theta += coefs[0]
+
+            else:
+
+                x_dot_theta = X_batch.dot(coefs)
+
+            # sigmoid calculated as in self.sigmoid but into the output array
+            batch_predictions = predictions[rows]
+
+            np.logaddexp(0, x_dot_theta, out = batch_predictions)
+
+            np.subtract(x_dot_theta, batch_predictions, out = batch_predictions)
+
+            np.exp(batch_predictions, out = batch_predictions)
+
+        if output == 'sklearn':
+
+            np.subtract(1, out[:, 1], out = out[:, 0])
+
+        return out
+
+
+    def scorer(self, names = None):
+        """Function to return a Scorer for low latency scoring of single rows and small batches.
+
+        Parameters
+        ----------
+        names : list or None, default = None
+            Names of the columns of X, used to score rows given as dicts. If None the 
+            names from the coefficients table (x1, x2, ...) are used.
 
         """
 
+        coefs = self.coefficients['coef'].to_numpy()
+
         if self.fit_intercept:
-            
-            X = np.hstack([np.ones((X.shape[0], 1)), X])
 
-        predictions = self.calculate_p(self.coefficients['coef'].to_numpy(), X)  
+            intercept, coefs = coefs[0], coefs[1:]
+
+        else:
+
+            intercept = 0
+
+        if names is None:
+
+            names = [name for name in self.coefficient_names if not name == 'intercept']
+
+        return Scorer(intercept = intercept, coefficients = coefs, names = names, x_mean = self.x_mean, x_scale = self.x_scale)
 
-        return predictions
 
+    def save(self, path, names = None):
+        """Function to save what is needed to score with the model to a compact .npz or .json file.
+
+        The file holds only the names, intercept, coefficients and standardisation statistics,
+        not the coefficients table, optimisation results or scaler. Load it with 
+        scoring.load, which returns a Scorer and only needs numpy.
+
+        Parameters
+        ----------
+        path : str or os.PathLike
+            File to save to, saved as JSON if path ends with .json otherwise as .npz.
+
+        names : list or None, default = None
+            Names of the columns of X, see scorer.
+
+        """
+
+        self.scorer(names = names).save(path)
 
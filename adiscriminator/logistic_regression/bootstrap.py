@@ -0,0 +1,261 @@
+import copy
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from adiscriminator.logistic_regression.fair import GroupMeanEqualisingRegression
+from adiscriminator.logistic_regression.cross_validation import save_arrays, load_arrays
+
+
+
+def bootstrap(model, X, y, n_replicates = 1000, sample_weight = None, alpha = 0.05, n_jobs = 1, random_state = None):
+    """Function to calculate bootstrap confidence intervals for the coefficients (and the group mean difference) of a model.
+
+    The model is fit once on all rows. Each replicate is then fit with weights drawn from
+    the multinomial distribution (the number of times each row would be drawn when
+    resampling m rows with replacement) as sample_weight, rather than on a resampled copy
+    of X, starting from the coefficients fit on all rows. The 'newton' solver usually
+    converges from this warm start in one or two iterations. The standardisation of X
+    from the fit on all rows is kept for every replicate, so X is not standardised again.
+
+    Replicates run on a pool of n_jobs processes, with X, y, the row level group encoding
+    and sample_weight saved once and memory-mapped by each process as in
+    cross_validation.cross_validate. Each replicate's weights are drawn in the process
+    from its own seed, so only seeds are sent to the processes and results do not depend
+    on n_jobs.
+
+    For GroupMeanEqualisingRegression the largest difference in group mean predictions (d,
+    see frontier) is calculated for each replicate with the replicate's weights, so its
+    interval includes the uncertainty in the group means.
+
+    Parameters
+    ----------
+    model : LogisticRegression
+        Unfit model, GroupMeanEqualisingRegression must be created with the group for all
+        rows of X. The model is not modified.
+
+    X : np.ndarray, np.memmap, scipy.sparse matrix or str
+        2d array of explanatory variables, see LogisticRegression.fit.
+
+    y : np.ndarray
+        1d array of response variable.
+
+    n_replicates : int, default = 1000
+        Number of bootstrap replicates.
+
+    sample_weight : np.ndarray or None, default = None
+        1d array of frequency weights for each row, the number of times each row occurs
+        (e.g. the counts from data.deduplicate). Each replicate resamples the
+        sum(sample_weight) observations rather than the unique rows, drawing each row's
+        count from the multinomial distribution with probabilities proportional to
+        sample_weight, so the replicates match those of the bootstrap on the rows before
+        deduplication. Weights must be non-negative integers.
+
+    alpha : float, default = 0.05
+        Intervals are the alpha / 2 and 1 - alpha / 2 quantiles of the replicates.
+
+    n_jobs : int, default = 1
+        Number of processes to fit replicates on, -1 to use all cpus.
+
+    random_state : int or None, default = None
+        Seed for the replicates' weights.
+
+    Returns
+    -------
+    intervals : pd.DataFrame
+        Table indexed by the coefficient names (and d) giving the estimate from all rows,
+        the standard deviation of the replicates (se), the lower and upper bounds of the
+        percentile interval and the number of replicates they are calculated from
+        (n_replicates). Replicates where the optimiser did not converge are left out of
+        the intervals, so n_replicates is less than the n_replicates argument if any
+        failed.
+
+    replicates : pd.DataFrame
+        Table with a row for each replicate giving whether the optimiser converged, the
+        number of iterations, d (GroupMeanEqualisingRegression only) and the coefficients
+        (on the scale of X).
+
+    """
+
+    import pandas as pd
+
+    if not type(n_replicates) is int or n_replicates < 2:
+
+        raise ValueError('n_replicates must be an int of at least 2')
+
+    if sample_weight is not None:
+
+        sample_weight = np.asarray(sample_weight, dtype = np.float64)
+
+        if np.any(sample_weight < 0) or np.any(sample_weight != np.round(sample_weight)):
+
+            raise ValueError('sample_weight must be non-negative integer counts to bootstrap')
+
+    fair = isinstance(model, GroupMeanEqualisingRegression)
+
+    if fair and not hasattr(model, 'group_codes'):
+
+        raise ValueError('model has no group, GroupMeanEqualisingRegression must be created with the group for X and not fit')
+
+    group_codes = model.group_codes if fair else None
+
+    X = model.prepare_X(X) if not isinstance(X, (str, os.PathLike)) else X
+
+    full = copy.copy(model)
+
+    full.fit(X, y, sample_weight)
+
+    estimate = full.coefficients.set_index('name')['coef']
+
+    if fair:
+
+        # group is deleted in fit so is restored to calculate d on all rows
+        full.group_codes = group_codes
+
+        full.count_groups()
+
+        _, d = full.log_loss_and_group_mean_difference(full.optimisation_results['x'], full.prepare_X(X), y)
+
+        estimate = pd.concat([estimate, pd.Series({'d': d})])
+
+        full.group = full.group_codes = None
+
+    arrays = {
+        'X': X,
+        'y': np.asarray(y),
+        'group_codes': group_codes,
+        'sample_weight': sample_weight
+    }
+
+    seeds = np.random.SeedSequence(random_state).spawn(n_replicates)
+
+    n_processes = min(os.cpu_count() if n_jobs == -1 else n_jobs, n_replicates)
+
+    if n_processes <= 1:
+
+        results = fit_replicates(arrays, full, range(n_replicates), seeds)
+
+    else:
+
+        # several batches per process so processes that finish early take more
+        batches = np.array_split(np.arange(n_replicates), 4 * n_processes)
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            paths = save_arrays(arrays, directory)
+
+            with ProcessPoolExecutor(max_workers = n_processes) as executor:
+
+                results = executor.map(
+                    fit_replicates,
+                    [paths] * len(batches),
+                    [full] * len(batches),
+                    batches,
+                    [[seeds[replicate] for replicate in batch] for batch in batches]
+                )
+
+                results = [row for rows in results for row in rows]
+
+    replicates = pd.DataFrame(results)
+
+    # replicates that did not converge are not estimates of the coefficients
+    values = replicates.loc[replicates['success'], estimate.index]
+
+    intervals = pd.DataFrame(
+        {
+            'estimate': estimate,
+            'se': values.std(),
+            'lower': values.quantile(alpha / 2),
+            'upper': values.quantile(1 - alpha / 2),
+            'n_replicates': len(values)
+        }
+    )
+
+    return intervals, replicates
+
+
+def fit_replicates(arrays, model, replicates, seeds):
+    """Function to fit model with multinomial weights for each of some bootstrap replicates.
+
+    Parameters
+    ----------
+    arrays : dict
+        X, y, group_codes and sample_weight, or the paths to them from save_arrays.
+
+    model : LogisticRegression
+        Model fit on all rows, without the row level group for GroupMeanEqualisingRegression.
+
+    replicates : iterable
+        Numbers of the replicates, returned in the results.
+
+    seeds : list
+        np.random.SeedSequence for each replicate.
+
+    """
+
+    if isinstance(arrays['y'], (str, os.PathLike)):
+
+        arrays = load_arrays(arrays)
+
+    X, y, group_codes, sample_weight = arrays['X'], arrays['y'], arrays['group_codes'], arrays['sample_weight']
+
+    model = copy.copy(model)
+
+    model.n_jobs = 1
+
+    X = model.prepare_X(X)
+
+    y = np.asarray(y)
+
+    fair = isinstance(model, GroupMeanEqualisingRegression)
+
+    if fair:
+
+        model.group_codes = np.asarray(group_codes)
+
+    initial_theta = model.optimisation_results['x']
+
+    # resample the observations, each row of X standing for sample_weight of them
+    if sample_weight is None:
+
+        n_observations, probabilities = model.m, np.full(model.m, 1 / model.m)
+
+    else:
+
+        n_observations = int(round(np.sum(sample_weight)))
+
+        probabilities = np.asarray(sample_weight) / np.sum(sample_weight)
+
+    rows = []
+
+    for replicate, seed in zip(replicates, seeds):
+
+        weights = np.random.default_rng(seed).multinomial(n_observations, probabilities).astype(np.float64)
+
+        # the standardisation from the fit on all rows is kept, only the weights change
+        model.sample_weight = weights
+
+        model.sample_weight_total = np.sum(weights)
+
+        row = {'replicate': replicate}
+
+        if fair:
+
+            model.count_groups()
+
+        results = model.optimise(X, y, initial_theta)
+
+        row.update(success = results['success'], nit = results['nit'])
+
+        if fair:
+
+            _, row['d'] = model.log_loss_and_group_mean_difference(results['x'], X, y)
+
+        model.extract_coefficients(results['x'])
+
+        row.update(zip(model.coefficient_names, model.coefficients['coef']))
+
+        rows.append(row)
+
+    return rows
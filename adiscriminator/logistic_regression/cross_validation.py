@@ -0,0 +1,356 @@
+import copy
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from adiscriminator.logistic_regression.base import issparse
+from adiscriminator.logistic_regression.fair import GroupMeanEqualisingRegression
+
+
+
+def cross_validate(model, X, y, lambdas, n_splits = 5, sample_weight = None, warm_start = True, n_jobs = 1, random_state = None):
+    """Function to estimate the out of fold log loss (and group mean difference) for each of a sequence of lambda_ values.
+
+    The rows are split at random into n_splits folds. For each fold the model is fit on
+    the other folds with each lambda and evaluated on the fold.
+
+    With n_jobs other than 1 the fits run on a pool of processes. X, y, the row level
+    group encoding (for GroupMeanEqualisingRegression) and sample_weight are saved once
+    to .npy files in a temporary directory (X given as a path to a .npy file is used as
+    is) and memory-mapped by each process, so only the fold's row indices and the unfit
+    model are sent to each process rather than a copy of the data. Each fold is fit on
+    the whole memory-mapped X with zero weight for the rows of the fold (as in
+    bootstrap.bootstrap), so the training rows are not copied, only the rows of the fold
+    are read into memory to evaluate the model.
+
+    For GroupMeanEqualisingRegression the group the model was created with is split with
+    the rows, encoded against the levels of the whole group so that every fold has the
+    same levels, and the group mean differences are penalised on the training folds.
+
+    Parameters
+    ----------
+    model : LogisticRegression
+        Unfit model to cross validate, e.g. RidgeRegression or GroupMeanEqualisingRegression
+        (created with the group for all rows of X). The model is not modified.
+
+    X : np.ndarray, np.memmap, scipy.sparse matrix or str
+        2d array of explanatory variables, see LogisticRegression.fit.
+
+    y : np.ndarray
+        1d array of response variable.
+
+    lambdas : iterable
+        Regularisation strengths to fit the model with.
+
+    n_splits : int, default = 5
+        Number of folds.
+
+    sample_weight : np.ndarray or None, default = None
+        1d array of weights for each row, see LogisticRegression.fit. The out of fold log
+        loss is the weighted average over the rows of the fold.
+
+    warm_start : bool, default = True
+        Should each fit on a fold start from the coefficients for the previous lambda (see
+        RidgeRegression.ridge_path)? If True the lambdas for a fold are fit in turn in one
+        process, so there are n_splits tasks, otherwise each fold and lambda is a separate
+        task fit from zero coefficients.
+
+    n_jobs : int, default = 1
+        Number of processes to fit folds on, -1 to use all cpus. If 1 the folds are fit
+        in this process without saving the data.
+
+    random_state : int or None, default = None
+        Seed for the random split of rows into folds.
+
+    Returns
+    -------
+    results : pd.DataFrame
+        Table with a row for each fold and lambda giving the fold, lambda_, the log loss on
+        the fold, the largest difference in group mean predictions on the fold (d, for
+        GroupMeanEqualisingRegression only), whether the optimiser converged and the
+        number of iterations.
+
+    """
+
+    import pandas as pd
+
+    lambdas = list(lambdas)
+
+    if len(lambdas) == 0:
+
+        raise ValueError('lambdas must contain at least one value')
+
+    if not type(n_splits) is int or n_splits < 2:
+
+        raise ValueError('n_splits must be an int of at least 2')
+
+    fair = isinstance(model, GroupMeanEqualisingRegression)
+
+    if fair and not hasattr(model, 'group_codes'):
+
+        raise ValueError('model has no group, GroupMeanEqualisingRegression must be created with the group for X and not fit')
+
+    X = model.prepare_X(X) if not isinstance(X, (str, os.PathLike)) else X
+
+    arrays = {
+        'X': X,
+        'y': np.asarray(y),
+        'group_codes': model.group_codes if fair else None,
+        'sample_weight': None if sample_weight is None else np.asarray(sample_weight, dtype = np.float64)
+    }
+
+    m = arrays['y'].shape[0]
+
+    # rows of each fold are sorted so they are read from X in order
+    rng = np.random.default_rng(random_state)
+
+    folds = [np.sort(rows) for rows in np.array_split(rng.permutation(m), n_splits)]
+
+    # the model is sent to each task without the row level group, which is in arrays
+    template = copy.copy(model)
+
+    if fair:
+
+        template.group = None
+
+        template.group_codes = None
+
+    if warm_start:
+
+        tasks = [(template, fold, folds[fold], lambdas) for fold in range(n_splits)]
+
+    else:
+
+        tasks = [(template, fold, folds[fold], [lambda_]) for fold in range(n_splits) for lambda_ in lambdas]
+
+    n_processes = min(os.cpu_count() if n_jobs == -1 else n_jobs, len(tasks))
+
+    if n_processes <= 1:
+
+        results = [fit_fold(arrays, *task) for task in tasks]
+
+    else:
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            paths = save_arrays(arrays, directory)
+
+            with ProcessPoolExecutor(max_workers = n_processes) as executor:
+
+                results = list(executor.map(fit_fold, [paths] * len(tasks), *zip(*tasks)))
+
+    results = pd.DataFrame([row for rows in results for row in rows])
+
+    if not fair:
+
+        results = results.drop(columns = 'd')
+
+    return results.sort_values(['fold', 'lambda_'], kind = 'stable', ignore_index = True)
+
+
+def save_arrays(arrays, directory):
+    """Function to save arrays to .npy files in directory to be memory-mapped by other processes.
+
+    Sparse matrices are saved as the arrays of their CSR format. X given as a path is not
+    saved again. Returns a dict of the paths to load with load_arrays.
+
+    Parameters
+    ----------
+    arrays : dict
+        Arrays to save, None values are kept as None.
+
+    directory : str
+        Directory to save to.
+
+    """
+
+    paths = {}
+
+    for name, array in arrays.items():
+
+        if array is None or isinstance(array, (str, os.PathLike)):
+
+            paths[name] = array
+
+        elif issparse(array):
+
+            array = array.tocsr()
+
+            paths[name] = {'shape': array.shape}
+
+            for component in ['data', 'indices', 'indptr']:
+
+                paths[name][component] = os.path.join(directory, f'{name}_{component}.npy')
+
+                np.save(paths[name][component], getattr(array, component))
+
+        else:
+
+            paths[name] = os.path.join(directory, f'{name}.npy')
+
+            np.save(paths[name], array)
+
+    return paths
+
+
+def load_arrays(paths):
+    """Function to memory-map the arrays saved with save_arrays.
+
+    Parameters
+    ----------
+    paths : dict
+        Paths returned from save_arrays.
+
+    """
+
+    arrays = {}
+
+    for name, path in paths.items():
+
+        if path is None:
+
+            arrays[name] = None
+
+        elif isinstance(path, dict):
+
+            import scipy.sparse as sp
+
+            components = [np.load(path[component], mmap_mode = 'r') for component in ['data', 'indices', 'indptr']]
+
+            arrays[name] = sp.csr_matrix(tuple(components), shape = path['shape'])
+
+        else:
+
+            arrays[name] = np.load(path, mmap_mode = 'r')
+
+    return arrays
+
+
+def fit_fold(arrays, model, fold, test_rows, lambdas):
+    """Function to fit model on all rows but test_rows for each lambda and evaluate it on test_rows.
+
+    Parameters
+    ----------
+    arrays : dict
+        X, y, group_codes and sample_weight, or the paths to them from save_arrays.
+
+    model : LogisticRegression
+        Unfit model, without the row level group for GroupMeanEqualisingRegression.
+
+    fold : int
+        Number of the fold, returned in the results.
+
+    test_rows : np.ndarray
+        Sorted indices of the rows in the fold.
+
+    lambdas : list
+        Regularisation strengths to fit the model with, in turn with warm starts.
+
+    """
+
+    if isinstance(arrays['y'], (str, os.PathLike)):
+
+        arrays = load_arrays(arrays)
+
+    X, y, group_codes, sample_weight = arrays['X'], arrays['y'], arrays['group_codes'], arrays['sample_weight']
+
+    if isinstance(X, (str, os.PathLike)):
+
+        X = np.load(X, mmap_mode = 'r')
+
+    y = np.asarray(y)
+
+    # the rows of the fold are left out of the fit with zero weight
+    weight_train = np.ones(y.shape[0]) if sample_weight is None else np.array(sample_weight, dtype = np.float64)
+
+    weight_train[test_rows] = 0
+
+    X_test, y_test = X[test_rows], y[test_rows]
+
+    weight_test = None if sample_weight is None else np.asarray(sample_weight[test_rows])
+
+    model = copy.copy(model)
+
+    model.n_jobs = 1
+
+    fair = isinstance(model, GroupMeanEqualisingRegression)
+
+    if fair:
+
+        # the group counts and contrasts are calculated from the codes and weights in
+        # prepare_fit, so only the training rows are counted
+        model.group = model.group_codes = np.asarray(group_codes)
+
+    X = model.prepare_fit(X, weight_train)
+
+    theta = np.zeros(model.n)
+
+    rows = []
+
+    for lambda_ in lambdas:
+
+        model.lambda_ = lambda_
+
+        results = model.optimise(X, y, theta)
+
+        theta = results['x']
+
+        # unpenalised log loss on the fold, log(1 + exp(z)) - y * z is log(1 + exp(-z))
+        # for y = 1 and log(1 + exp(z)) for y = 0
+        z = model.linear_predictor(theta, model.prepare_X(X_test)).astype(np.float64)
+
+        log_loss = np.average(np.logaddexp(0, z) - y_test * z, weights = weight_test)
+
+        d = None
+
+        if fair:
+
+            d = fold_group_mean_difference(model, model.sigmoid(z), np.asarray(group_codes[test_rows]), weight_test)
+
+        rows.append(
+            {
+                'fold': fold,
+                'lambda_': lambda_,
+                'log_loss': log_loss,
+                'd': d,
+                'success': results['success'],
+                'nit': results['nit']
+            }
+        )
+
+    return rows
+
+
+def fold_group_mean_difference(model, p, codes, sample_weight = None):
+    """Function to calculate the largest difference in group mean predictions for rows with given group codes.
+
+    Parameters
+    ----------
+    model : GroupMeanEqualisingRegression
+        Model the codes were encoded with, used for the comparisons between levels.
+
+    p : np.ndarray
+        Predictions for the rows.
+
+    codes : np.ndarray
+        2d array of the rows' codes from GroupMeanEqualisingRegression.encode_group.
+
+    sample_weight : np.ndarray or None, default = None
+        1d array of weights for the rows, the group means are weighted means if given.
+
+    """
+
+    weighted_p = p if sample_weight is None else p * sample_weight
+
+    group_sums = np.bincount(codes.ravel(), weights = np.repeat(weighted_p, codes.shape[1]), minlength = len(model.group_attributes))
+
+    group_counts = np.bincount(
+        codes.ravel(), 
+        weights = None if sample_weight is None else np.repeat(sample_weight, codes.shape[1]), 
+        minlength = len(model.group_attributes)
+    )
+
+    d = model.calculate_group_contrasts(group_counts).dot(group_sums / np.maximum(group_counts, 1))
+
+    return d[np.argmax(np.abs(d))] if len(d) > 0 else 0
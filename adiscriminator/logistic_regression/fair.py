@@ -1,6 +1,9 @@
+import copy
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
-from adiscriminator.logistic_regression.base import LogisticRegression
+from adiscriminator.logistic_regression.base import LogisticRegression, add_statistics
 
 
 
@@ -11,8 +14,10 @@ class GroupMeanEqualisingRegression(LogisticRegression):
 
     Parameters
     ----------
-    group : np.ndarray
-        Group membership variable, can only have 2 levels 0 and 1 currently.
+    group : np.ndarray or pd.DataFrame
+        Group membership variable. A 2d array (or DataFrame) with a column for each of 
+        several protected attributes penalises differences in group means for each 
+        attribute. Each attribute can have any number of levels.
 
     fit_intercept : bool, default = True
         Should an intercept be included in the model?
@@ -22,171 +27,758 @@ class GroupMeanEqualisingRegression(LogisticRegression):
 
     lambda_ : int or float, default = 0
         Regularisation strength. Larger values penalise coefficient values more.
+
+    solver : str, default = 'tnc'
+        Optimisation method used to fit the model, either 'tnc' or 'newton'. See 
+        LogisticRegression for details. With 'newton' the Gauss-Newton approximation
+        to the Hessian of the group mean difference penalty is used.
+
+    chunk_size : int or None, default = None
+        Number of rows of X processed at a time in fit. See LogisticRegression for details.
+
+    n_jobs : int, default = 1
+        Number of threads used to process chunks of rows in fit. See LogisticRegression for details.
+
+    dtype : np.float64 or np.float32, default = np.float64
+        Floating point type used for X and calculations with X. See LogisticRegression for details.
+
+    comparison : str, default = 'pairwise'
+        Differences in group means that are penalised, for each attribute. Either 'pairwise'
+        for the difference between every pair of levels or 'overall' for the difference 
+        between each level and the mean over all rows. The penalty is the sum over these 
+        differences. With 2 levels 'pairwise' penalises the single difference between them.
+
+    standard_errors : bool, default = False
+        Should standard errors of the coefficients be calculated in fit? See LogisticRegression for details.
         
     """
 
-    def __init__(self, group, fit_intercept = True, standardise = True, lambda_ = 0):
+    comparisons = ['pairwise', 'overall']
+
+    # decayed sums of predictions and row counts by group, used in place of the group
+    # means for the current data when fitting on mini-batches, see partial_fit
+    running_group_sums = None
+    running_group_counts = None
+
+    # group of the last mini-batch passed to partial_fit, group_codes and group_counts 
+    # are for this group rather than the group the model was created with if it is set
+    batch_group = None
 
-        super().__init__(fit_intercept = fit_intercept, standardise = standardise)
+    def __init__(self, group, fit_intercept = True, standardise = True, lambda_ = 0, solver = 'tnc', chunk_size = None, n_jobs = 1, dtype = np.float64, 
+                 comparison = 'pairwise', standard_errors = False):
+
+        super().__init__(fit_intercept = fit_intercept, standardise = standardise, solver = solver, chunk_size = chunk_size, n_jobs = n_jobs, dtype = dtype, standard_errors = standard_errors)
 
         self.lambda_ = lambda_
 
-        if len(np.unique(group)) > 2:
+        if not comparison in self.comparisons:
+
+            raise ValueError(f'comparison must be one of {self.comparisons}')
 
-            raise NotImplementedError('group can have a max of 2 levels')
+        self.comparison = comparison
 
         self.group = group
 
+        self.encode_group(group)
+
+
+    def encode_group(self, group, group_levels = None):
+        """Encode group as integer codes with counts by level, once rather than on every optimiser call.
+
+        The levels of each attribute (column of group) are numbered consecutively across
+        attributes, so each row has one code per attribute and sums by level for all 
+        attributes are calculated in one np.bincount. The contrasts between level means 
+        that are penalised are calculated from the counts (see calculate_group_contrasts).
+
+        Parameters
+        ----------
+        group : np.ndarray or pd.DataFrame
+            Group membership variable, 1d or with a column for each attribute.
+
+        group_levels : list or None, default = None
+            Levels of each attribute to encode against. If None the levels are found from 
+            group. Used to encode mini-batches against the levels of the group the model 
+            was created with.
+
+        """
+
+        group = np.asarray(group)
+
+        if group.ndim < 2:
+
+            group = group.reshape(-1, 1)
+
+        if group_levels is None:
+
+            group_levels = [np.unique(group[:, attribute]) for attribute in range(group.shape[1])]
+
+        elif not len(group_levels) == group.shape[1]:
+
+            raise ValueError('group must have the same number of attributes as the group the model was created with')
+
+        codes = []
+
+        offset = 0
+
+        for attribute, levels in enumerate(group_levels):
+
+            attribute_codes = np.searchsorted(levels, group[:, attribute])
+
+            if np.any(attribute_codes == len(levels)) or np.any(levels[attribute_codes % len(levels)] != group[:, attribute]):
+
+                raise ValueError('group contains levels not in the group the model was created with')
+
+            codes.append(attribute_codes + offset)
+
+            offset += len(levels)
+
+        self.group_levels = group_levels
+
+        # attribute that each level code belongs to
+        self.group_attributes = np.repeat(np.arange(len(group_levels)), [len(levels) for levels in group_levels])
+
+        self.group_codes = np.column_stack(codes)
+
+        self.count_groups()
+
+
+    def count_groups(self):
+        """Count the rows, or total sample weight, for each level and calculate the contrasts between levels."""
+
+        weights = None
+
+        if self.sample_weight is not None:
+
+            weights = np.repeat(self.sample_weight, self.group_codes.shape[1])
+
+        self.group_counts = np.bincount(self.group_codes.ravel(), weights = weights, minlength = len(self.group_attributes))
+
+        self.group_contrasts = self.calculate_group_contrasts(self.group_counts)
+
+
+    def calculate_group_contrasts(self, group_counts):
+        """Calculate the matrix mapping the group means to the differences in group means that are penalised.
+
+        Each row of the returned matrix is one difference; with comparison 'pairwise' one 
+        row per pair of levels of an attribute and with 'overall' one row per level, where 
+        the overall mean is the count weighted average of the level means. Levels with a 
+        count of 0 are left out of the comparisons.
+
+        Parameters
+        ----------
+        group_counts : np.ndarray
+            Number of rows for each level code.
+
+        """
+
+        n_levels = len(group_counts)
+
+        contrasts = []
+
+        for attribute in np.unique(self.group_attributes):
+
+            levels = np.flatnonzero((self.group_attributes == attribute) & (group_counts > 0))
+
+            if self.comparison == 'pairwise':
+
+                for level, other_level in itertools.combinations(levels, 2):
+
+                    contrast = np.zeros(n_levels)
+
+                    contrast[level], contrast[other_level] = 1, -1
+
+                    contrasts.append(contrast)
+
+            else:
+
+                overall_weights = np.zeros(n_levels)
+
+                overall_weights[levels] = group_counts[levels] / np.sum(group_counts[levels])
+
+                for level in levels:
+
+                    contrast = -overall_weights
+
+                    contrast[level] += 1
+
+                    contrasts.append(contrast)
+
+        return np.array(contrasts).reshape(-1, n_levels)
+
+
+    def delete_group(self):
+        """Delete group and the row level group encoding, after fitting."""
+
+        for attribute in ['group', 'group_codes']:
+
+            delattr(self, attribute)
+
 
-    def fit(self, X, y):
+    def fit(self, X, y, sample_weight = None, callback = None):
         """Function to fit model to given explanatory variables (X) and response variable (y).
         
         Function calls base.LogisticRegression.fit() then deletes the group attribute.
 
         Parameters
         ----------
-        X : np.ndarray
-            2d array of explanatory variables to fit model on.
+        X : np.ndarray, np.memmap, scipy.sparse matrix or str
+            2d array of explanatory variables to fit model on, see base.LogisticRegression.fit.
 
         y : np.ndarray
             1d array of response variable.
 
+        sample_weight : np.ndarray or None, default = None
+            1d array of weights for each row, see base.LogisticRegression.fit. Group means
+            are weighted means.
+
+        callback : callable or None, default = None
+            Function called after each iteration of the optimiser, see base.LogisticRegression.fit.
+
         """
 
+        X = self.prepare_X(X)
+
         if not len(self.group) == X.shape[0]:
             
             raise ValueError('group must be the same length as X')
 
-        base_fit = super().fit(X, y)
+        if self.batch_group is not None:
+
+            self.encode_group(self.group, self.group_levels)
+
+            self.batch_group = None
 
-        delattr(self, 'group')
+        self.running_group_sums = None
+
+        self.running_group_counts = None
+
+        base_fit = super().fit(X, y, sample_weight, callback)
+
+        self.delete_group()
 
         return base_fit
 
 
-    def cost_function(self, theta, X, y):
-        '''Calculate the cost for given theta, X and y.
+    def prepare_fit(self, X, sample_weight = None):
+        """Function to prepare X and set the attributes that depend on X before fitting.
+
+        Function calls base.LogisticRegression.prepare_fit() then counts the group levels 
+        with the sample weights.
+
+        Parameters
+        ----------
+        X : np.ndarray, np.memmap, scipy.sparse matrix or str
+            2d array of explanatory variables to fit model on, see fit.
+
+        sample_weight : np.ndarray or None, default = None
+            1d array of weights for each row, see fit.
+
+        """
+
+        X = super().prepare_fit(X, sample_weight)
+
+        self.count_groups()
+
+        return X
+
+
+    def frontier(self, X, y, lambdas, warm_start = True, sample_weight = None):
+        """Function to fit the model for each of a sequence of lambda_ values and summarise the fairness-accuracy trade off.
+
+        X is prepared and standardised once for all lambdas. If warm_start is True the model 
+        is fit for each lambda in turn starting from the coefficients for the previous lambda, 
+        ordering lambdas from smallest to largest usually gives the best warm starts. If 
+        warm_start is False each lambda is fit independently from zero coefficients, with 
+        lambdas spread over n_jobs threads. The model is left fit with the last lambda and 
+        the group attribute is deleted, as in fit.
+
+        Parameters
+        ----------
+        X : np.ndarray, np.memmap, scipy.sparse matrix or str
+            2d array of explanatory variables to fit model on, see fit.
+
+        y : np.ndarray
+            1d array of response variable.
+
+        lambdas : iterable
+            Regularisation strengths to fit the model with.
+
+        warm_start : bool, default = True
+            Should each fit start from the coefficients for the previous lambda?
+
+        sample_weight : np.ndarray or None, default = None
+            1d array of weights for each row, see fit.
+
+        Returns
+        -------
+        frontier : pd.DataFrame
+            Table with a row for each lambda giving lambda_, the log loss and largest difference
+            in group mean predictions (d) for the fitted model, whether the optimiser converged 
+            and the coefficients (on the scale of X).
+
+        """
+
+        import pandas as pd
+
+        lambdas = list(lambdas)
+
+        if len(lambdas) == 0:
+
+            raise ValueError('lambdas must contain at least one value')
+
+        X = self.prepare_X(X)
+
+        if not len(self.group) == X.shape[0]:
+            
+            raise ValueError('group must be the same length as X')
+
+        if self.batch_group is not None:
+
+            self.encode_group(self.group, self.group_levels)
+
+            self.batch_group = None
+
+        self.running_group_sums = None
+
+        self.running_group_counts = None
+
+        X = self.prepare_fit(X, sample_weight)
+
+        if warm_start:
+
+            theta = np.zeros(self.n)
+
+            optimisation_results = []
+
+            for lambda_ in lambdas:
+
+                self.lambda_ = lambda_
+
+                optimisation_results.append(self.optimise(X, y, theta))
+
+                theta = optimisation_results[-1]['x']
+
+        else:
+
+            optimisation_results = self.map_lambdas(X, y, lambdas)
+
+        rows = []
+
+        for lambda_, results in zip(lambdas, optimisation_results):
+
+            log_loss, d = self.log_loss_and_group_mean_difference(results['x'], X, y)
+
+            self.extract_coefficients(results['x'])
+
+            rows.append([lambda_, log_loss, d, results['success']] + list(self.coefficients['coef']))
+
+        frontier = pd.DataFrame(rows, columns = ['lambda_', 'log_loss', 'd', 'success'] + self.coefficient_names)
+
+        self.lambda_ = lambdas[-1]
+
+        self.optimisation_results = optimisation_results[-1]
+
+        self.delete_group()
+
+        return frontier
+
+
+    def map_lambdas(self, X, y, lambdas):
+        """Function to fit the model independently for each lambda, on a thread pool if n_jobs is not 1.
+
+        Each lambda is fit on a shallow copy of the model, so X and group are shared 
+        between threads rather than copied. Rows are not split between threads within 
+        each fit. Results are returned in the order of lambdas.
+
+        Parameters
+        ----------
+        X : np.ndarray, np.memmap or scipy.sparse matrix
+            2d array of explanatory variables returned from prepare_fit.
+
+        y : np.ndarray
+            1d array of response variable.
+
+        lambdas : list
+            Regularisation strengths to fit the model with.
+
+        """
+
+        def optimise_lambda(lambda_):
+
+            model = copy.copy(self)
+
+            model.lambda_ = lambda_
+
+            model.n_jobs = 1
+
+            return model.optimise(X, y, np.zeros(self.n))
+
+        n_threads = min(self.get_n_threads(), len(lambdas))
+
+        if n_threads <= 1:
+
+            return [optimise_lambda(lambda_) for lambda_ in lambdas]
+
+        with ThreadPoolExecutor(max_workers = n_threads) as executor:
+
+            return list(executor.map(optimise_lambda, lambdas))
+
+
+    def log_loss_and_group_mean_difference(self, theta, X, y):
+        """Function to calculate the unpenalised log loss and largest difference in group mean predictions for given theta.
+
+        The difference in group means with the largest absolute value is returned, which 
+        is the only difference for a group with 2 levels.
 
-        Function includes penalty for differences between mean of groups.
-        
         Parameters
         ----------
         theta : np.ndarray
             Coefficient values.
 
-        X : np.ndarray
-            2d array of explanatory variables to fit model on.
+        X : np.ndarray, np.memmap or scipy.sparse matrix
+            2d array of explanatory variables returned from prepare_fit.
 
         y : np.ndarray
             1d array of response variable.
 
-        '''
+        """
 
-        J = super().cost_function(theta, X, y)
+        y = y.reshape(self.m)
 
-        p = super().calculate_p(theta, X)
+        J, statistics = 0, None
 
-        d = self.calculate_group_mean_differences(p, self.group)
+        for J_chunk, grad_chunk, statistics_chunk in self.map_chunks(self.chunk_loss_and_grad, theta, X, y):
 
-        group_mean_difference_penalty = -np.log(1 - d ** 2)
+            J = J + J_chunk
 
-        J = J + self.lambda_ * group_mean_difference_penalty
+            statistics = add_statistics(statistics, statistics_chunk)
 
-        return J
+        d, d_grad = self.group_mean_differences_from_statistics(statistics)
 
+        d = d[np.argmax(np.abs(d))] if len(d) > 0 else 0
+
+        return J / self.weight_total(), d
+
+
+    def partial_fit(self, X, y, group, learning_rate = 0.01, group_mean_decay = 0.9):
+        """Function to update the model with one mini-batch of explanatory variables (X), response (y) and group.
+
+        Function calls base.LogisticRegression.partial_fit() after encoding the batch's group,
+        which is kept in the batch_group attribute so the group the model was created with 
+        is still available to fit. The difference in group means in the penalty is calculated from 
+        running estimates of the group means across batches (exponentially weighted sums of 
+        predictions and counts) rather than from the batch alone, the gradient of the difference 
+        is estimated on the batch. The batch group is encoded against the levels of the group
+        the model was created with.
 
-    def calculate_group_mean_differences(self, p, g):
-        """Calculate the difference in average prediction by groups.
-        
         Parameters
         ----------
-        p : np.ndarray
-            Predictions.
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables for the batch.
+
+        y : np.ndarray
+            1d array of response variable for the batch.
+
+        group : np.ndarray
+            Group membership variable for the batch.
+
+        learning_rate : float, default = 0.01
+            Step size for the Adam update.
+
+        group_mean_decay : float, default = 0.9
+            Weight given to previous batches in the running group means, in [0, 1).
+
+        """
+
+        if not len(group) == X.shape[0]:
+            
+            raise ValueError('group must be the same length as X')
+
+        # the batch group counts are not weighted
+        self.sample_weight = None
+
+        self.encode_group(group, self.group_levels)
+
+        if self.stream_state is None:
+
+            self.running_group_sums = np.zeros(len(self.group_counts))
+
+            self.running_group_counts = np.zeros(len(self.group_counts))
+
+        self.batch_group = group
+
+        self.group_mean_decay = group_mean_decay
+
+        return super().partial_fit(X, y, learning_rate = learning_rate)
+
+
+    def update_running_group_mean_differences(self, group_sums, group_counts):
+        """Update the running group means with the batch predictions and return their differences.
+
+        Parameters
+        ----------
+        group_sums : np.ndarray
+            Sums of predictions by level for the current batch.
+
+        group_counts : np.ndarray
+            Number of rows by level for the current batch.
+
+        Returns
+        -------
+        d : np.ndarray
+            Differences in running group means.
+
+        contrasts : np.ndarray
+            Contrasts between levels that d is calculated with, levels are only compared 
+            once they have been seen.
 
-        g : np.ndarray
-            Group membership variable.
-        
         """
 
-        g1_loc = g == 0
+        self.running_group_sums = self.group_mean_decay * self.running_group_sums + group_sums
 
-        g1_weight = np.sum(g1_loc)
+        self.running_group_counts = self.group_mean_decay * self.running_group_counts + group_counts
 
-        g2_weight = len(g) - g1_weight  
+        contrasts = self.calculate_group_contrasts(self.running_group_counts)
 
-        g1_ave = np.sum(p[g1_loc]) / g1_weight
+        running_group_means = np.divide(
+            self.running_group_sums, 
+            self.running_group_counts, 
+            out = np.zeros(len(self.running_group_sums)), 
+            where = self.running_group_counts > 0
+        )
 
-        g2_ave = np.sum(p[np.invert(g1_loc)]) / g2_weight
+        d = contrasts.dot(running_group_means)
 
-        d = g1_ave - g2_ave
+        return d, contrasts
 
-        return d
 
+    def penalty_statistics(self, theta, X, p, rows):
+        '''Calculate the sums by group of the predictions and the gradient of the predictions for some rows.
 
-    def gradient(self, theta, X, y):
-        '''Calculate the gradient of the cost function w.r.t. each element of theta. 
+        The sums are accumulated over chunks of rows in loss_and_grad and hessian, the 
+        differences in group means and their gradients are then calculated from the totals
+        (see group_mean_differences_from_statistics).
 
-        Also includes gradient accounting for the difference in group means penalty term.
-        
         Parameters
         ----------
         theta : np.ndarray
             Coefficient values.
 
-        X : np.ndarray
-            2d array of explanatory variables to fit model on.
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables for the rows.
+
+        p : np.ndarray
+            1d array of predictions for the current theta for the rows.
+
+        rows : slice
+            Rows of the full data that X and p correspond to.
 
-        y : np.ndarray
-            1d array of response variable.        
-        
         '''
 
-        grad = super().gradient(theta, X, y)
+        codes = self.group_codes[rows]
 
-        grad_penalty = self.gradient_group_mean_differences(theta, X, y)
+        w = self.chunk_weights(rows)
 
-        grad = grad + grad_penalty
+        weighted_p = p if w is None else p * w
 
-        return grad
+        # codes for all attributes are in one code space so the sums by level for every
+        # attribute are calculated in a single pass
+        group_sums = np.bincount(codes.ravel(), weights = np.repeat(weighted_p, codes.shape[1]), minlength = len(self.group_counts))
 
+        group_gradient_sums = self.gradient_group_mean_differences(p, X, codes, w)
 
-    def gradient_group_mean_differences(self, theta, X, y):
-        '''Calculate the gradient for the difference in group means penalty term only. 
+        return group_sums, group_gradient_sums
+
+
+    def group_mean_differences_from_statistics(self, statistics, group_counts = None, contrasts = None):
+        '''Calculate the differences in group means and their gradients w.r.t. theta from penalty statistics.
+
+        Parameters
+        ----------
+        statistics : tuple
+            Sums by group of the predictions and the gradient of the predictions over all 
+            rows, see penalty_statistics.
+
+        group_counts : np.ndarray or None, default = None
+            Number of rows by level, if None group_counts from encode_group is used.
+
+        contrasts : np.ndarray or None, default = None
+            Contrasts between levels, if None group_contrasts from encode_group is used.
+
+        Returns
+        -------
+        d : np.ndarray
+            Differences in group means.
+
+        d_grad : np.ndarray
+            2d array with the gradient of each difference in group means as rows.
+
+        '''
+
+        if group_counts is None:
+
+            group_counts = self.group_counts
+
+        if contrasts is None:
+
+            contrasts = self.group_contrasts
+
+        group_sums, group_gradient_sums = statistics
+
+        # levels with no rows are not in any contrasts, so are divided by 1 rather than 0
+        group_counts = np.maximum(group_counts, 1)
+
+        d = contrasts.dot(group_sums / group_counts)
+
+        d_grad = contrasts.dot(group_gradient_sums / group_counts[:, None])
+
+        return d, d_grad
+
+
+    def penalty(self, theta, statistics):
+        '''Calculate the penalty for differences between mean of groups and its gradient.
+
+        The penalty is the sum of -lambda * log(1 - d ** 2) over the differences in group 
+        means (d) for every attribute, see comparison.
 
-        Derivation can be found in the derivation.md file.
-        
         Parameters
         ----------
         theta : np.ndarray
             Coefficient values.
 
-        X : np.ndarray
-            2d array of explanatory variables to fit model on.
+        statistics : tuple
+            Sums by group of the predictions and the gradient of the predictions over all 
+            rows, see penalty_statistics.
 
-        y : np.ndarray
-            1d array of response variable.        
-        
         '''
 
-        p = super().calculate_p(theta, X)
+        if self.running_group_sums is None:
 
-        d = self.calculate_group_mean_differences(p, self.group)
+            d, d_grad = self.group_mean_differences_from_statistics(statistics)
 
-        p_one_minus_p = p * (1 - p)
+        else:
 
-        p_one_minus_p_X = p_one_minus_p * X
+            # the differences in group means are running estimates across batches while
+            # their gradients are estimated on the batch
+            group_sums, group_gradient_sums = statistics
 
-        g1_loc = self.group == 0
+            d, contrasts = self.update_running_group_mean_differences(group_sums, self.group_counts)
 
-        g1_weight = np.sum(g1_loc)
+            _, d_grad = self.group_mean_differences_from_statistics(statistics, contrasts = contrasts)
 
-        g2_weight = len(self.group) - g1_weight  
+        # -log(1 - d ** 2) calculated as -log((1 - d)(1 + d)) with log1p, which is
+        # accurate as |d| approaches 1 and for small d
+        group_mean_difference_penalty = -np.sum(np.log1p(-d) + np.log1p(d))
 
-        g1_gradient = p_one_minus_p_X[g1_loc].sum(axis = 0) / g1_weight 
+        penalty = self.lambda_ * group_mean_difference_penalty
 
-        g2_gradient = p_one_minus_p_X[np.invert(g1_loc)].sum(axis = 0) / g2_weight
+        # the penalty in the cost is -lambda * log(1 - d ** 2) so the gradient is the
+        # negative of the one derived for lambda * log(1 - d ** 2) in derivation.md
+        grad = (2 * d * self.lambda_ / ((1 - d) * (1 + d))).dot(d_grad)
 
-        grad = -2 * d * self.lambda_ * (g1_gradient - g2_gradient)  / (1 - d ** 2) 
+        return penalty, grad
 
-        return grad
 
+    def penalty_hessian(self, theta, statistics):
+        '''Calculate the Gauss-Newton approximation to the Hessian of the group mean difference penalty.
+
+        Only the first term of the second derivative in derivation.md is kept (the term
+        involving the second derivative of d is dropped), which keeps the approximation
+        positive semi-definite.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        statistics : tuple
+            Sums by group of the predictions and the gradient of the predictions over all 
+            rows, see penalty_statistics.
+
+        '''
+
+        d, d_grad = self.group_mean_differences_from_statistics(statistics)
+
+        h = 2 * self.lambda_ * (1 + d ** 2) / ((1 - d) * (1 + d)) ** 2
+
+        H = d_grad.T.dot(h[:, None] * d_grad)
+
+        return H
+
+
+    def calculate_group_mean_differences(self, p, g):
+        """Calculate the differences in average prediction by groups.
+
+        g is encoded against the levels of the group the model was created with and the
+        differences are those given by comparison.
+        
+        Parameters
+        ----------
+        p : np.ndarray
+            Predictions.
+
+        g : np.ndarray or pd.DataFrame
+            Group membership variable.
+        
+        """
+
+        model = copy.copy(self)
+
+        model.sample_weight = None
+
+        model.encode_group(g, self.group_levels)
+
+        group_sums = np.bincount(model.group_codes.ravel(), weights = np.repeat(p, model.group_codes.shape[1]), minlength = len(model.group_counts))
+
+        d = model.group_contrasts.dot(group_sums / np.maximum(model.group_counts, 1))
+
+        return d
+
+
+    def gradient_group_mean_differences(self, p, X, codes, sample_weight = None):
+        '''Calculate the sums by group of the gradient of the predictions w.r.t. theta for some rows. 
+
+        Derivation can be found in the derivation.md file. The gradient of p is p(1 - p) 
+        times the design matrix, so the sums by level are a sparse indicator matrix, with 
+        p(1 - p) in the column for each row's level of each attribute, transposed times the
+        design matrix. This is a single product whatever the number of levels. Dividing by 
+        the counts by level gives the gradients of the group means (see 
+        group_mean_differences_from_statistics).
+        
+        Parameters
+        ----------
+        p : np.ndarray
+            1d array of predictions for the current theta.
+
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables for the rows.
+
+        codes : np.ndarray
+            2d array of level codes for the rows, with a column for each attribute.
+
+        sample_weight : np.ndarray or None, default = None
+            1d array of weights for the rows.
+        
+        '''
+
+        import scipy.sparse as sp
+
+        n_rows, n_attributes = codes.shape
+
+        p_one_minus_p = p * (1 - p)
+
+        if sample_weight is not None:
+
+            p_one_minus_p *= sample_weight
+
+        indicator = sp.csr_matrix(
+            (
+                np.repeat(p_one_minus_p, n_attributes), 
+                (np.repeat(np.arange(n_rows), n_attributes), codes.ravel())
+            ),
+            shape = (n_rows, len(self.group_counts))
+        )
+
+        grad = self.sparse_transpose_dot(indicator, X)
+
+        return grad
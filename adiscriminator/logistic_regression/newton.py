@@ -0,0 +1,119 @@
+import numpy as np
+
+
+
+def minimize_newton(fun, x0, args = (), hess = None, tol = 1e-10, max_iter = 100, callback = None):
+    """Function to minimise a function with (damped) Newton steps using its exact Hessian.
+
+    For logistic regression this is equivalent to iteratively reweighted least squares (IRLS).
+    Each iteration solves H step = grad and then backtracks along the step until the Armijo
+    condition is met. Iterations stop once half the squared Newton decrement (grad.T H^-1 grad / 2),
+    which estimates the remaining reduction in fun, is below tol. This criterion does not depend
+    on the scaling of the inputs.
+
+    Parameters
+    ----------
+    fun : callable
+        Function to minimise, must return the function value and its gradient for given x and args.
+
+    x0 : np.ndarray
+        Initial values.
+
+    args : tuple, default = ()
+        Additional arguments passed to fun and hess.
+
+    hess : callable
+        Function returning the Hessian of fun for given x and args.
+
+    tol : float, default = 1e-10
+        Tolerance for half the squared Newton decrement.
+
+    max_iter : int, default = 100
+        Maximum number of Newton iterations.
+
+    callback : callable or None, default = None
+        Function called with x after each iteration, as in scipy.optimize.minimize.
+
+    Returns
+    -------
+    results : scipy.optimize.OptimizeResult
+        Optimisation results with the same attributes as those returned from scipy.optimize.minimize.
+
+    """
+
+    import scipy.optimize as op
+
+    x = np.asarray(x0, dtype = float).copy()
+
+    f, g = fun(x, *args)
+
+    nfev, nhev = 1, 0
+
+    status, message = 1, 'Maximum number of iterations has been exceeded.'
+
+    for nit in range(1, max_iter + 1):
+
+        H = hess(x, *args)
+
+        nhev += 1
+
+        try:
+
+            step = np.linalg.solve(H, g)
+
+        except np.linalg.LinAlgError:
+
+            step = np.linalg.lstsq(H, g, rcond = None)[0]
+
+        decrement = g.dot(step)
+
+        if decrement / 2 <= tol:
+
+            status, message = 0, 'Optimization terminated successfully.'
+
+            break
+
+        # backtracking line search with the armijo condition
+        t = 1
+
+        while True:
+
+            x_new = x - t * step
+
+            f_new, g_new = fun(x_new, *args)
+
+            nfev += 1
+
+            if f_new <= f - 1e-4 * t * decrement or t < 1e-10:
+
+                break
+
+            t = t / 2
+
+        if t < 1e-10:
+
+            status, message = 2, 'Line search failed to decrease the function value.'
+
+            break
+
+        x, f, g = x_new, f_new, g_new
+
+        if callback is not None:
+
+            callback(x)
+
+    results = op.OptimizeResult(
+        x = x,
+        fun = f,
+        jac = g,
+        hess = H,
+        nit = nit,
+        nfev = nfev,
+        njev = nfev,
+        nhev = nhev,
+        status = status,
+        success = status == 0,
+        message = message
+    )
+
+    return results
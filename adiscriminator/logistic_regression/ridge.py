@@ -1,3 +1,5 @@
+import numpy as np
+
 from adiscriminator.logistic_regression.base import LogisticRegression
 
 
@@ -21,11 +23,27 @@ class RidgeRegression(LogisticRegression):
     penalised_intercept : bool default = False
         Should the intercept term be penalised as well as coefficients for explanatory variables?
 
+    solver : str, default = 'tnc'
+        Optimisation method used to fit the model, either 'tnc' or 'newton'. See 
+        LogisticRegression for details.
+
+    chunk_size : int or None, default = None
+        Number of rows of X processed at a time in fit. See LogisticRegression for details.
+
+    n_jobs : int, default = 1
+        Number of threads used to process chunks of rows in fit. See LogisticRegression for details.
+
+    dtype : np.float64 or np.float32, default = np.float64
+        Floating point type used for X and calculations with X. See LogisticRegression for details.
+
+    standard_errors : bool, default = False
+        Should standard errors of the coefficients be calculated in fit? See LogisticRegression for details.
+
     """
 
-    def __init__(self, fit_intercept = True, standardise = True, lambda_ = 0, penalise_intercept = False):
+    def __init__(self, fit_intercept = True, standardise = True, lambda_ = 0, penalise_intercept = False, solver = 'tnc', chunk_size = None, n_jobs = 1, dtype = np.float64, standard_errors = False):
 
-        super().__init__(fit_intercept = fit_intercept, standardise = standardise)
+        super().__init__(fit_intercept = fit_intercept, standardise = standardise, solver = solver, chunk_size = chunk_size, n_jobs = n_jobs, dtype = dtype, standard_errors = standard_errors)
 
         if not type(penalise_intercept) is bool:
             
@@ -36,65 +54,141 @@ class RidgeRegression(LogisticRegression):
         self.lambda_ = lambda_
 
 
-    def cost_function(self, theta, X, y):
-        '''Calculate the cost with l2 penalty for given theta, X and y.
-        
+    def ridge_path(self, X, y, lambdas, sample_weight = None):
+        """Function to fit the model for each of a sequence of lambda_ values.
+
+        X is prepared and standardised once, then the model is fit for each lambda in 
+        turn starting from the coefficients for the previous lambda (a warm start), which 
+        needs far fewer iterations than starting each fit from zero. Ordering lambdas 
+        from largest to smallest usually gives the best warm starts. The model is left 
+        fit with the last lambda. Standard errors are not calculated for the path, so 
+        ridge_path raises a ValueError for a model created with standard_errors = True; 
+        fit the model for a chosen lambda_ to get them.
+
         Parameters
         ----------
-        theta : np.ndarray
-            Coefficient values.
-
-        X : np.ndarray
-            2d array of explanatory variables to fit model on.
+        X : np.ndarray, np.memmap, scipy.sparse matrix or str
+            2d array of explanatory variables to fit model on, see fit.
 
         y : np.ndarray
             1d array of response variable.
 
-        '''
-        
-        J = super().cost_function(theta, X, y)
-        
-        if self.penalise_intercept:
+        lambdas : iterable
+            Regularisation strengths to fit the model with.
 
-            penalty_term = self.lambda_ * sum(theta ** 2) / (2 * self.m)
+        sample_weight : np.ndarray or None, default = None
+            1d array of weights for each row, see fit.
 
-        else:
+        Returns
+        -------
+        coefficients : pd.DataFrame
+            Coefficients (on the scale of X) with a row for each lambda and a column for 
+            each coefficient.
 
-            penalty_term = self.lambda_ * sum(theta[1:] ** 2) / (2 * self.m)
-        
-        J = J + penalty_term
+        diagnostics : pd.DataFrame
+            Optimisation results for each lambda; the final cost, number of iterations,
+            number of function evaluations, whether the optimiser converged and its message.
+
+        """
+
+        import pandas as pd
+
+        lambdas = list(lambdas)
+
+        if len(lambdas) == 0:
+
+            raise ValueError('lambdas must contain at least one value')
+
+        if self.standard_errors:
+
+            raise ValueError('standard errors are not calculated in ridge_path, create the model with standard_errors = False')
+
+        X = self.prepare_fit(X, sample_weight)
+
+        theta = np.zeros(self.n)
+
+        coefficients, diagnostics = [], []
+
+        for lambda_ in lambdas:
 
-        return J
+            self.lambda_ = lambda_
 
+            self.optimisation_results = self.optimise(X, y, theta)
 
-    def gradient(self, theta, X, y):
-        '''Calculate the gradient of the cost function including l2 penalty term w.r.t. each element of theta.
+            theta = self.optimisation_results['x']
+
+            self.extract_coefficients(theta)
+
+            coefficients.append(self.coefficients['coef'].to_numpy())
+
+            diagnostics.append(
+                {
+                    'lambda_': lambda_,
+                    'cost': self.optimisation_results['fun'],
+                    'nit': self.optimisation_results['nit'],
+                    'nfev': self.optimisation_results['nfev'],
+                    'success': self.optimisation_results['success'],
+                    'message': self.optimisation_results['message']
+                }
+            )
+
+        coefficients = pd.DataFrame(
+            coefficients, 
+            columns = self.coefficient_names, 
+            index = pd.Index(lambdas, name = 'lambda_')
+        )
+
+        diagnostics = pd.DataFrame(diagnostics)
+
+        return coefficients, diagnostics
+
+
+    def penalty(self, theta, statistics):
+        '''Calculate the l2 penalty term and its gradient w.r.t. each element of theta.
         
         Parameters
         ----------
         theta : np.ndarray
             Coefficient values.
 
-        X : np.ndarray
-            2d array of explanatory variables to fit model on.
-
-        y : np.ndarray
-            1d array of response variable.   
+        statistics : None
+            Penalty statistics, not used as the l2 penalty only depends on theta.
 
         '''
 
-        grad = J = super().gradient(theta, X, y)
-
-        penalty_term = (self.lambda_ / self.m) * theta
+        penalised_theta = theta.copy()
 
         if not self.penalise_intercept:
 
-            penalty_term[0] = 0
+            penalised_theta[0] = 0
+
+        penalty_term = self.lambda_ * sum(penalised_theta ** 2) / (2 * self.weight_total())
+
+        grad = (self.lambda_ / self.weight_total()) * penalised_theta
 
-        grad = grad + penalty_term
+        return penalty_term, grad
+
+
+    def penalty_hessian(self, theta, statistics):
+        '''Calculate the Hessian of the l2 penalty term w.r.t. theta.
+        
+        Parameters
+        ----------
+        theta : np.ndarray
+            Coefficient values.
+
+        statistics : None
+            Penalty statistics, not used as the l2 penalty only depends on theta.
+
+        '''
+
+        penalised = np.ones(theta.shape[0])
+
+        if not self.penalise_intercept:
 
-        grad = grad.flatten()
+            penalised[0] = 0
 
-        return grad
+        H = np.diag(penalised) * self.lambda_ / self.weight_total()
 
+        return H
 
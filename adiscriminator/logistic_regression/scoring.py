@@ -0,0 +1,201 @@
+import json
+import math
+import os
+import numpy as np
+
+
+
+class Scorer():
+    """Scoring object for a fitted logistic regression model with minimal per call overhead.
+
+    Holds the intercept and coefficients (on the scale of X, so no standardisation is
+    needed) as a contiguous array for scoring arrays of rows and as Python floats for
+    scoring a single row given as a list, tuple or dict, where numpy's per call overhead
+    would dominate. Create from a fitted model with LogisticRegression.scorer() or load
+    one saved with save (see load). Only numpy is needed to load and score.
+
+    Parameters
+    ----------
+    intercept : float
+        Intercept, 0 for models without an intercept.
+
+    coefficients : np.ndarray
+        1d array of coefficients for each column of X.
+
+    names : list or None, default = None
+        Names of the columns of X, used to score rows given as dicts.
+
+    x_mean : np.ndarray or None, default = None
+        Column means from the standardisation of X in fit, kept for reference only as
+        coefficients are on the scale of X.
+
+    x_scale : np.ndarray or None, default = None
+        Column scales from the standardisation of X in fit, kept for reference only.
+
+    """
+
+    def __init__(self, intercept, coefficients, names = None, x_mean = None, x_scale = None):
+
+        self.intercept = float(intercept)
+
+        self.coefficients = np.ascontiguousarray(coefficients, dtype = np.float64)
+
+        if names is None:
+
+            names = [f'x{i}' for i in range(1, self.coefficients.shape[0] + 1)]
+
+        if not len(names) == self.coefficients.shape[0]:
+
+            raise ValueError('names must be the same length as coefficients')
+
+        self.names = list(names)
+
+        self.coefficient_list = self.coefficients.tolist()
+
+        self.named_coefficients = list(zip(self.names, self.coefficient_list))
+
+        self.x_mean = None if x_mean is None else np.asarray(x_mean, dtype = np.float64)
+
+        self.x_scale = None if x_scale is None else np.asarray(x_scale, dtype = np.float64)
+
+
+    def score(self, row):
+        """Function to return the prediction for a single row.
+
+        Parameters
+        ----------
+        row : list, tuple, dict or np.ndarray
+            Values of the explanatory variables in the order of the columns of X, or a
+            dict keyed by names.
+
+        """
+
+        z = self.intercept
+
+        if isinstance(row, dict):
+
+            for name, coefficient in self.named_coefficients:
+
+                z += coefficient * row[name]
+
+        else:
+
+            if not len(row) == len(self.coefficient_list):
+
+                raise ValueError(f'row must have {len(self.coefficient_list)} values')
+
+            for coefficient, value in zip(self.coefficient_list, row):
+
+                z += coefficient * value
+
+        # sigmoid calculated so that math.exp does not overflow for large |z|
+        if z >= 0:
+
+            return 1 / (1 + math.exp(-z))
+
+        exp_z = math.exp(z)
+
+        return exp_z / (1 + exp_z)
+
+
+    def predict_proba(self, X, out = None):
+        """Function to return predictions for a 2d array of rows as a 1d array.
+
+        Parameters
+        ----------
+        X : np.ndarray or scipy.sparse matrix
+            2d array of explanatory variables to predict for.
+
+        out : np.ndarray or None, default = None
+            1d array to write the predictions into. If None a new array is returned.
+
+        """
+
+        z = X.dot(self.coefficients)
+
+        z += self.intercept
+
+        if out is None:
+
+            out = np.empty_like(z)
+
+        # sigmoid(z) = exp(z - log(1 + exp(z))), calculated into out
+        np.logaddexp(0, z, out = out)
+
+        np.subtract(z, out, out = out)
+
+        np.exp(out, out = out)
+
+        return out
+
+
+    def save(self, path):
+        """Function to save the scorer to a .npz file, or a .json file if path ends with .json.
+
+        Only the names, intercept, coefficients and standardisation statistics are saved.
+        Load with load.
+
+        Parameters
+        ----------
+        path : str or os.PathLike
+            File to save to.
+
+        """
+
+        arrays = {
+            'names': self.names,
+            'intercept': self.intercept,
+            'coefficients': self.coefficients
+        }
+
+        for name in ['x_mean', 'x_scale']:
+
+            if getattr(self, name) is not None:
+
+                arrays[name] = getattr(self, name)
+
+        if os.fspath(path).endswith('.json'):
+
+            with open(path, 'w') as f:
+
+                json.dump({name: np.asarray(value).tolist() for name, value in arrays.items()}, f)
+
+        else:
+
+            # np.savez appends .npz to paths without it, the file is written directly so
+            # the path is used as given
+            with open(path, 'wb') as f:
+
+                np.savez(f, **{name: np.asarray(value) for name, value in arrays.items()})
+
+
+
+def load(path):
+    """Function to load a Scorer saved with Scorer.save or LogisticRegression.save.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        .npz or .json file to load.
+
+    """
+
+    if os.fspath(path).endswith('.json'):
+
+        with open(path) as f:
+
+            arrays = json.load(f)
+
+    else:
+
+        with np.load(path, allow_pickle = False) as npz:
+
+            arrays = {name: npz[name] for name in npz.files}
+
+    return Scorer(
+        intercept = float(arrays['intercept']),
+        coefficients = arrays['coefficients'],
+        names = [str(name) for name in arrays['names']],
+        x_mean = arrays.get('x_mean'),
+        x_scale = arrays.get('x_scale')
+    )
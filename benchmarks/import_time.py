@@ -0,0 +1,56 @@
+"""Benchmark of the time taken to import adiscriminator and the scoring module.
+
+Each import is timed in a fresh interpreter, as repeated imports in one process are
+cached. Run from the root of the repo with
+
+    python benchmarks/import_time.py [--repeats 5]
+
+and compare with the times for numpy alone; the package and scoring path should only
+add a few milliseconds to importing numpy, see tests/test_imports.py.
+
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+statements = {
+    'numpy': 'import numpy',
+    'adiscriminator': 'import adiscriminator',
+    'scoring': 'from adiscriminator.logistic_regression.scoring import load',
+    'base': 'from adiscriminator.logistic_regression.base import LogisticRegression',
+    'fit dependencies': 'import pandas, scipy.optimize, scipy.sparse, sklearn.preprocessing'
+}
+
+
+def time_import(statement, repeats):
+    """Function to return the median time in seconds to run statement in a new interpreter."""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    code = f'import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)'
+
+    times = []
+
+    for _ in range(repeats):
+
+        result = subprocess.run([sys.executable, '-c', code], capture_output = True, text = True, check = True, cwd = root)
+
+        times.append(float(result.stdout))
+
+    return statistics.median(times)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+
+    parser.add_argument('--repeats', type = int, default = 5)
+
+    args = parser.parse_args()
+
+    for name, statement in statements.items():
+
+        print(f'{name:<20} {1000 * time_import(statement, args.repeats):8.1f} ms')
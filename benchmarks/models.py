@@ -0,0 +1,266 @@
+"""Benchmark of fitting, the cost and gradient and scoring on synthetic data.
+
+Times fit, a single evaluation of loss_and_grad (the work done per optimiser
+iteration) and predict_proba for LogisticRegression, RidgeRegression and
+GroupMeanEqualisingRegression over grids of rows (m), columns (n) and groups, along
+with the peak memory allocated in fit. sklearn's LogisticRegression and statsmodels'
+Logit are run on the same data as baselines. Run from the root of the repo with
+
+    python benchmarks/models.py [--m 1000 10000 100000] [--n 10 50] [--groups 2 5]
+                                [--output results.csv] [--compare baseline.csv]
+
+Save results from a known good version with --output, then pass that file to
+--compare to print the ratio of each time to the baseline; the script exits with
+status 1 if any time is more than --threshold times slower.
+
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# import adiscriminator from this repo rather than an installed version
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adiscriminator.logistic_regression.base import LogisticRegression
+from adiscriminator.logistic_regression.ridge import RidgeRegression
+from adiscriminator.logistic_regression.fair import GroupMeanEqualisingRegression
+
+
+timings = ['fit', 'loss_and_grad', 'predict_proba']
+
+
+def make_data(m, n, n_groups, seed = 0):
+    """Function to simulate X, y and group, with y depending on X and group."""
+
+    rng = np.random.default_rng(seed)
+
+    X = rng.standard_normal((m, n))
+
+    group = rng.integers(0, n_groups, size = m)
+
+    z = X.dot(rng.standard_normal(n) / np.sqrt(n)) + 0.5 * (group - (n_groups - 1) / 2)
+
+    y = (rng.random(m) < 1 / (1 + np.exp(-z))).astype(np.float64)
+
+    return X, y, group
+
+
+def best_time(function, repeats):
+    """Function to return the minimum time in seconds over repeats calls of function."""
+
+    times = []
+
+    for _ in range(repeats):
+
+        start = time.perf_counter()
+
+        function()
+
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def peak_memory(function):
+    """Function to return the peak memory in MB allocated while calling function.
+
+    Run separately from the timings as tracemalloc slows down allocation.
+
+    """
+
+    tracemalloc.start()
+
+    try:
+
+        function()
+
+        peak = tracemalloc.get_traced_memory()[1]
+
+    finally:
+
+        tracemalloc.stop()
+
+    return peak / 2 ** 20
+
+
+def make_models(group):
+    """Function to return the models to benchmark, as functions of no arguments returning an unfit model."""
+
+    return {
+        'LogisticRegression': lambda: LogisticRegression(),
+        'RidgeRegression': lambda: RidgeRegression(lambda_ = 1),
+        'GroupMeanEqualisingRegression': lambda: GroupMeanEqualisingRegression(group = group, lambda_ = 1)
+    }
+
+
+def benchmark_model(make_model, X, y, repeats):
+    """Function to benchmark fit, loss_and_grad and predict_proba for one model."""
+
+    # the untimed fit is also a warm up, so the imports done on first use (e.g. pandas, 
+    # scipy and sklearn, see base) are not included in the first timed fit
+    model = make_model()
+
+    model.fit(X, y)
+
+    fit_time = best_time(lambda: make_model().fit(X, y), repeats)
+
+    # time the cost and gradient at the fitted coefficients on X prepared as in fit
+    theta = model.optimisation_results['x']
+
+    unfit = make_model()
+
+    X_prepared = unfit.prepare_fit(X)
+
+    loss_and_grad_time = best_time(lambda: unfit.loss_and_grad(theta, X_prepared, y), repeats)
+
+    return {
+        'fit': fit_time,
+        'loss_and_grad': loss_and_grad_time,
+        'predict_proba': best_time(lambda: model.predict_proba(X), repeats),
+        'nit': model.optimisation_results['nit'],
+        'peak_memory_mb': peak_memory(lambda: make_model().fit(X, y))
+    }
+
+
+def benchmark_sklearn(X, y, repeats):
+    """Function to benchmark sklearn's LogisticRegression, with effectively no penalty."""
+
+    from sklearn.linear_model import LogisticRegression as SklearnLogisticRegression
+
+    make_model = lambda: SklearnLogisticRegression(C = 1e10, max_iter = 1000)
+
+    model = make_model().fit(X, y)
+
+    return {
+        'fit': best_time(lambda: make_model().fit(X, y), repeats),
+        'predict_proba': best_time(lambda: model.predict_proba(X), repeats),
+        'nit': int(model.n_iter_[0]),
+        'peak_memory_mb': peak_memory(lambda: make_model().fit(X, y))
+    }
+
+
+def benchmark_statsmodels(X, y, repeats):
+    """Function to benchmark statsmodels' Logit."""
+
+    import statsmodels.api as sm
+
+    X_intercept = sm.add_constant(X)
+
+    fit = lambda: sm.Logit(y, X_intercept).fit(disp = 0)
+
+    result = fit()
+
+    return {
+        'fit': best_time(fit, repeats),
+        'predict_proba': best_time(lambda: result.predict(X_intercept), repeats),
+        'nit': int(result.mle_retvals['iterations']),
+        'peak_memory_mb': peak_memory(fit)
+    }
+
+
+def run(ms, ns, groups, repeats, baselines = True):
+    """Function to run the benchmarks over the grid of m, n and groups and return the results as a DataFrame."""
+
+    results = []
+
+    for m, n, n_groups in itertools.product(ms, ns, groups):
+
+        X, y, group = make_data(m, n, n_groups)
+
+        cases = {name: lambda make_model = make_model: benchmark_model(make_model, X, y, repeats) for name, make_model in make_models(group).items()}
+
+        # the baselines do not depend on the number of groups
+        if baselines and n_groups == groups[0]:
+
+            cases['sklearn'] = lambda: benchmark_sklearn(X, y, repeats)
+
+            cases['statsmodels'] = lambda: benchmark_statsmodels(X, y, repeats)
+
+        for name, case in cases.items():
+
+            try:
+
+                result = case()
+
+            except ImportError as error:
+
+                print(f'skipping {name}: {error}', file = sys.stderr)
+
+                continue
+
+            results.append({'model': name, 'm': m, 'n': n, 'groups': n_groups, **result})
+
+            print(f'{name:<30} m = {m:<8} n = {n:<4} groups = {n_groups:<3} fit = {result["fit"]:.4f}s', file = sys.stderr)
+
+    return pd.DataFrame(results)
+
+
+def compare(results, baseline, threshold):
+    """Function to return the ratio of each time in results to the time in baseline, and whether any ratio exceeds threshold."""
+
+    keys = ['model', 'm', 'n', 'groups']
+
+    merged = results.merge(baseline, on = keys, suffixes = ('', '_baseline'))
+
+    columns = [timing for timing in timings if timing in results and f'{timing}_baseline' in merged]
+
+    ratios = merged[keys].copy()
+
+    for timing in columns:
+
+        ratios[timing] = merged[timing] / merged[f'{timing}_baseline']
+
+    return ratios, bool((ratios[columns] > threshold).any(axis = None))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+
+    parser.add_argument('--m', type = int, nargs = '+', default = [1000, 10000, 100000])
+
+    parser.add_argument('--n', type = int, nargs = '+', default = [10, 50])
+
+    parser.add_argument('--groups', type = int, nargs = '+', default = [2, 5])
+
+    parser.add_argument('--repeats', type = int, default = 3)
+
+    parser.add_argument('--no-baselines', action = 'store_true', help = 'Do not run sklearn and statsmodels.')
+
+    parser.add_argument('--output', help = 'csv file to save the results to.')
+
+    parser.add_argument('--compare', help = 'csv file of results to compare to.')
+
+    parser.add_argument('--threshold', type = float, default = 1.25, help = 'Ratio to the baseline time counted as a regression.')
+
+    args = parser.parse_args()
+
+    results = run(args.m, args.n, args.groups, args.repeats, baselines = not args.no_baselines)
+
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+
+        print(results.to_string(index = False, float_format = '{:.4f}'.format))
+
+    if args.output is not None:
+
+        results.to_csv(args.output, index = False)
+
+    if args.compare is not None:
+
+        ratios, regressed = compare(results, pd.read_csv(args.compare), args.threshold)
+
+        print(f'\nratio to {args.compare}')
+
+        print(ratios.to_string(index = False, float_format = '{:.2f}'.format))
+
+        if regressed:
+
+            print(f'\ntimes more than {args.threshold} times the baseline', file = sys.stderr)
+
+            sys.exit(1)
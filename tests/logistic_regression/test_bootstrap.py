@@ -0,0 +1,126 @@
+import numpy as np
+
+import pytest
+from numpy.testing import assert_almost_equal, assert_array_equal
+
+import adiscriminator as ad
+from adiscriminator.logistic_regression.base import LogisticRegression
+from adiscriminator.logistic_regression.fair import GroupMeanEqualisingRegression
+from adiscriminator.logistic_regression.bootstrap import bootstrap
+
+
+
+class TestBootstrap():
+    """Tests for bootstrap."""
+
+    def setup_class(self):
+        """Load data to bootstrap models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y, self.group, _ = ad.data.data_to_sparse(adult.iloc[:5000])
+        self.X = self.X.toarray()
+        self.X_numeric, self.y_numeric = ad.data.data_to_np(adult)
+
+
+    def test_standard_errors_close_to_hessian(self):
+        """Test the bootstrap standard errors of an unpenalised model are close to those from the Hessian."""
+
+        model = LogisticRegression(solver = 'newton', standard_errors = True).fit(self.X_numeric, self.y_numeric)
+
+        intervals, replicates = bootstrap(LogisticRegression(solver = 'newton'), self.X_numeric, self.y_numeric, n_replicates = 200, random_state = 0)
+
+        assert len(replicates) == 200
+
+        assert replicates['success'].all()
+
+        assert_array_equal(intervals.index, model.coefficients['name'])
+
+        assert_almost_equal(intervals['estimate'].to_numpy(), model.coefficients['coef'].to_numpy(), decimal = 8)
+
+        assert np.all(np.abs(intervals['se'].to_numpy() / model.coefficients['se'].to_numpy() - 1) < 0.25)
+
+        assert np.all((intervals['lower'] < intervals['estimate']) & (intervals['estimate'] < intervals['upper']))
+
+
+    def test_group_mean_difference_interval(self):
+        """Test GroupMeanEqualisingRegression replicates have a group mean difference with an interval."""
+
+        model = GroupMeanEqualisingRegression(group = self.group, lambda_ = 1, solver = 'newton')
+
+        intervals, replicates = bootstrap(model, self.X, self.y, n_replicates = 20, random_state = 0)
+
+        assert 'd' in intervals.index
+
+        assert replicates['d'].std() > 0
+
+        assert intervals.loc['d', 'lower'] <= intervals.loc['d', 'upper']
+
+        # the model passed in is not fit
+        assert hasattr(model, 'group_codes') and not hasattr(model, 'coefficients')
+
+
+    def test_processes_equal_to_serial(self):
+        """Test replicates fit on a process pool equal those fit in this process."""
+
+        model = GroupMeanEqualisingRegression(group = self.group, lambda_ = 1, solver = 'newton')
+
+        _, serial = bootstrap(model, self.X, self.y, n_replicates = 6, random_state = 1)
+
+        _, parallel = bootstrap(model, self.X, self.y, n_replicates = 6, n_jobs = 2, random_state = 1)
+
+        assert_array_equal(parallel.to_numpy(), serial.to_numpy())
+
+
+    def test_deduplicated_equal_to_full(self):
+        """Test bootstrapping the deduplicated rows with their counts as sample_weight matches bootstrapping all rows."""
+
+        rng = np.random.default_rng(0)
+
+        X = rng.integers(0, 3, size = (5000, 2)).astype(np.float64)
+
+        y = (rng.random(5000) < 1 / (1 + np.exp(-X.dot([0.5, -0.5])))).astype(np.float64)
+
+        X_unique, y_unique, sample_weight = ad.data.deduplicate(X, y)
+
+        full, _ = bootstrap(LogisticRegression(solver = 'newton'), X, y, n_replicates = 300, random_state = 0)
+
+        deduplicated, _ = bootstrap(LogisticRegression(solver = 'newton'), X_unique, y_unique, n_replicates = 300, sample_weight = sample_weight, random_state = 1)
+
+        assert_almost_equal(deduplicated['estimate'].to_numpy(), full['estimate'].to_numpy(), decimal = 6)
+
+        assert np.all(np.abs(deduplicated['se'].to_numpy() / full['se'].to_numpy() - 1) < 0.15)
+
+
+    def test_non_count_sample_weight(self):
+        """Test sample_weight that are not counts of observations are rejected."""
+
+        with pytest.raises(ValueError):
+
+            bootstrap(LogisticRegression(), self.X_numeric, self.y_numeric, n_replicates = 2, sample_weight = np.full(len(self.y_numeric), 0.5))
+
+
+    def test_failed_replicates_left_out(self, mocker):
+        """Test replicates where the optimiser did not converge are left out of the intervals."""
+
+        def fit_replicates(*args):
+
+            rows = fit_replicates_unpatched(*args)
+
+            # a replicate that did not converge, with coefficients far from the others
+            rows[0]['success'] = False
+
+            rows[0].update({name: 1e6 for name in rows[0] if not name in ['replicate', 'success', 'nit']})
+
+            return rows
+
+        fit_replicates_unpatched = ad.logistic_regression.bootstrap.fit_replicates
+
+        mocker.patch('adiscriminator.logistic_regression.bootstrap.fit_replicates', fit_replicates)
+
+        intervals, replicates = bootstrap(LogisticRegression(solver = 'newton'), self.X_numeric, self.y_numeric, n_replicates = 10, random_state = 0)
+
+        assert len(replicates) == 10 and replicates['success'].sum() == 9
+
+        assert (intervals['n_replicates'] == 9).all()
+
+        assert (intervals['upper'] < 1e6).all()
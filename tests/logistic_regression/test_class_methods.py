@@ -1,10 +1,12 @@
+import itertools
 import numpy as np
 import scipy
+import scipy.sparse
 from sklearn.preprocessing import StandardScaler
 
 import pytest
 from pytest_mock import mocker
-from numpy.testing import assert_array_equal
+from numpy.testing import assert_array_equal, assert_almost_equal
 
 import adiscriminator as ad
 from adiscriminator.logistic_regression.base import LogisticRegression
@@ -50,11 +52,11 @@ class TestFit():
 
 
     def test_data_standardised_no_intercept(self, cls, mocker):
-        """Test that X is standardised if standardise is True, without an intercept fit."""
+        """Test that standardisation is applied in the linear predictor if standardise is True, without an intercept fit."""
 
         model = initialise_model(cls = cls, standardise = True, fit_intercept = False)
 
-        scaled_X = StandardScaler().fit_transform(self.X)
+        X_scaler = StandardScaler().fit(self.X)
 
         spy = mocker.spy(scipy.optimize, 'minimize')
 
@@ -68,15 +70,20 @@ class TestFit():
         # X is first item in 'arg' tuple
         call_X = call_arg_kwarg[0]
 
-        assert_array_equal(call_X, scaled_X)
+        # X is not standardised, the column means and scales are applied to the coefficients
+        assert_array_equal(call_X, self.X)
+
+        assert_array_equal(model.x_mean, X_scaler.mean_)
+
+        assert_array_equal(model.x_scale, X_scaler.scale_)
 
 
     def test_data_standardised_with_intercept(self, cls, mocker):
-        """Test that X is standardised if standardise is True, with an intercept fit."""
+        """Test that standardisation is applied in the linear predictor if standardise is True, with an intercept fit."""
 
         model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
 
-        scaled_X = StandardScaler().fit_transform(self.X)
+        X_scaler = StandardScaler().fit(self.X)
 
         spy = mocker.spy(scipy.optimize, 'minimize')
 
@@ -90,10 +97,12 @@ class TestFit():
         # X is first item in 'arg' tuple
         call_X = call_arg_kwarg[0]
 
-        # constant term is added in first column if fit_intercept is True
-        call_X_without_intercept = call_X[:,1:]
+        # X is not standardised, the column means and scales are applied to the coefficients
+        assert_array_equal(call_X, self.X)
+
+        assert_array_equal(model.x_mean, X_scaler.mean_)
 
-        assert_array_equal(call_X_without_intercept, scaled_X)
+        assert_array_equal(model.x_scale, X_scaler.scale_)
 
 
     def test_X_no_intercept(self, cls, mocker):
@@ -129,13 +138,24 @@ class TestFit():
 
         call_X = call_arg_kwarg[0]
 
-        call_X_without_intercept = call_X[:,1:]
+        # intercept is handled in the linear predictor so no constant column is added
+        assert_array_equal(call_X, self.X)
+
+
+    def test_float_X_not_copied(self, cls, mocker):
+        """Test float X is passed to the optimiser without being copied."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        X = self.X.astype(float)
+
+        spy = mocker.spy(scipy.optimize, 'minimize')
+
+        model.fit(X, self.y)
 
-        # check the non intercept columns are the same
-        assert_array_equal(call_X_without_intercept, self.X)
-                
-        # check intercept is all ones of correct shape
-        assert_array_equal(call_X[:, 0], np.ones((self.X.shape[0],)))
+        call_X = spy.call_args_list[0][1]['args'][0]
+
+        assert call_X is X, 'X passed to scipy.optimize.minimize is not the X passed to fit'
 
 
     def test_scipy_minimise_call(self, cls, mocker):
@@ -156,7 +176,7 @@ class TestFit():
 
         call_kwargs = spy.call_args_list[0][1]
 
-        assert call_kwargs['fun'] == model.cost_function, \
+        assert call_kwargs['fun'] == model.loss_and_grad, \
             """Unexpected 'fun' kwarg in scipy.optimize.minimize call"""
 
         # no intercept fit so initial theta is # columns 
@@ -170,9 +190,32 @@ class TestFit():
         assert call_kwargs['method'] == 'TNC', \
             """Unexpected 'method' kwarg in scipy.optimize.minimize call"""
 
-        assert call_kwargs['jac'] == model.gradient, \
+        assert call_kwargs['jac'] is True, \
             """Unexpected 'jac' kwarg in scipy.optimize.minimize call"""
 
+
+    def test_newton_solver_coefficients(self, cls):
+        """Test the newton solver gives the same coefficients as the default tnc solver."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        newton_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        newton_model.solver = 'newton'
+
+        newton_model.fit(self.X, self.y)
+
+        assert newton_model.optimisation_results['success'], 'newton solver did not converge'
+
+        assert_almost_equal(
+            newton_model.coefficients['std_coef'].to_numpy(),
+            model.coefficients['std_coef'].to_numpy(),
+            decimal = 2
+        )
+
+
     @pytest.mark.parametrize(
         "standardise,expected_cols", 
         [
@@ -272,6 +315,178 @@ class TestFit():
         ) 
 
 
+    def test_dataframe_input(self, cls):
+        """Test fitting and predicting on a pd.DataFrame gives the same results as on the np.ndarray."""
+
+        import pandas as pd
+
+        X_frame = pd.DataFrame(self.X, columns = ad.data.numeric_columns)
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        frame_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        frame_model.fit(X_frame, self.y)
+
+        assert_array_equal(frame_model.coefficients['coef'].to_numpy(), model.coefficients['coef'].to_numpy())
+
+        assert_array_equal(frame_model.predict_proba(X_frame), model.predict_proba(self.X))
+
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+class TestFitStream():
+    """Tests for the fit_stream and partial_fit methods on model classes."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    def batches(self, cls, n_epochs, batch_size = 2000, group = None):
+        """Generator of shuffled mini-batches over n_epochs passes of the data."""
+
+        np.random.seed(1)
+        random_group = (np.random.rand(32560) > 0.5).astype(int) if group is None else group
+
+        for epoch in range(n_epochs):
+
+            index = np.random.permutation(self.X.shape[0])
+
+            for start in range(0, self.X.shape[0], batch_size):
+
+                batch_index = index[start:start + batch_size]
+
+                batch = (self.X[batch_index], self.y[batch_index])
+
+                if cls is GroupMeanEqualisingRegression:
+
+                    batch = batch + (random_group[batch_index], )
+
+                yield batch
+
+
+    def test_partial_fit_updates_coefficients(self, cls):
+        """Test each partial_fit call takes one step and updates the coefficients table."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        batches = self.batches(cls, n_epochs = 1)
+
+        model.partial_fit(*next(batches))
+
+        first_coefficients = model.coefficients['coef'].to_numpy()
+
+        assert model.stream_state['iterations'] == 1, 'Unexpected number of iterations after 1 partial_fit call'
+
+        returned = model.partial_fit(*next(batches))
+
+        assert returned is model, 'partial_fit does not return self'
+
+        assert model.stream_state['iterations'] == 2, 'Unexpected number of iterations after 2 partial_fit calls'
+
+        assert model.stream_state['rows'] == 4000, 'Unexpected number of rows seen after 2 partial_fit calls'
+
+        assert list(model.coefficients['name']) == ['intercept'] + [f'x{i}' for i in range(1, self.X.shape[1] + 1)]
+
+        assert not np.array_equal(first_coefficients, model.coefficients['coef'].to_numpy()), \
+            'coefficients not updated by partial_fit'
+
+
+    def test_predictions_close_to_fit(self, cls):
+        """Test predictions from a model fit on mini-batches are close to those from fit."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        stream_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        stream_model.fit_stream(self.batches(cls, n_epochs = 50), learning_rate = 0.1)
+
+        mean_abs_difference = np.mean(np.abs(model.predict_proba(self.X) - stream_model.predict_proba(self.X)))
+
+        assert mean_abs_difference < 0.02, \
+            f'predictions from fit_stream differ from fit by {mean_abs_difference} on average'
+
+
+    def test_fit_after_fit_stream(self, cls):
+        """Test fit after fit_stream uses all rows of the group the model was created with."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        stream_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        stream_model.fit_stream(self.batches(cls, n_epochs = 1))
+
+        stream_model.fit(self.X, self.y)
+
+        assert_almost_equal(stream_model.coefficients['coef'].to_numpy(), model.coefficients['coef'].to_numpy(), decimal = 8)
+
+
+    def test_partial_fit_after_fit(self, cls):
+        """Test partial_fit after fit starts again rather than continuing from the batches before fit."""
+
+        batches = list(itertools.islice(self.batches(cls, n_epochs = 1), 2))
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.partial_fit(*batches[0])
+
+        model.fit(self.X, self.y)
+
+        assert model.stream_state is None, 'mini-batch state not discarded by fit'
+
+        model.partial_fit(*batches[1])
+
+        new_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        new_model.partial_fit(*batches[1])
+
+        assert model.stream_state['iterations'] == 1
+
+        assert_array_equal(model.coefficients['coef'].to_numpy(), new_model.coefficients['coef'].to_numpy())
+
+
+    def test_penalty_reduces_group_mean_difference(self, cls):
+        """Test fitting on mini-batches with lambda_ > 0 reduces the difference in group mean predictions."""
+
+        if cls is not GroupMeanEqualisingRegression:
+
+            pytest.skip('only GroupMeanEqualisingRegression penalises group mean differences')
+
+        # group related to X so the unpenalised predictions differ by group
+        group = (self.X[:, 0] > np.median(self.X[:, 0])).astype(int)
+
+        differences = []
+
+        for lambda_ in [0, 10]:
+
+            model = GroupMeanEqualisingRegression(group = group, lambda_ = lambda_)
+
+            model.fit_stream(self.batches(cls, n_epochs = 5, group = group), learning_rate = 0.1)
+
+            d = model.calculate_group_mean_differences(model.predict_proba(self.X)[:, 0], group)
+
+            differences.append(np.abs(d).max())
+
+        assert differences[1] < differences[0] / 2, \
+            f'group mean difference {differences[1]} with lambda_ = 10 not less than half of {differences[0]} with lambda_ = 0'
+
+
 
 @pytest.mark.parametrize(
     "cls", 
@@ -296,10 +511,10 @@ class TestCostFunction():
 
         model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
 
-        # set m as it is usually set in fit
-        model.m, model.n = self.X.shape
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
 
-        dummy_theta = np.zeros(self.X.shape[1])
+        dummy_theta = np.zeros(self.X.shape[1] + 1)
 
         J = model.cost_function(
             theta = dummy_theta,
@@ -339,10 +554,10 @@ class TestCalculateP():
 
         model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
 
-        # set m as it is usually set in fit
-        model.m, model.n = self.X.shape
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
 
-        dummy_theta = np.zeros(self.X.shape[1])
+        dummy_theta = np.zeros(self.X.shape[1] + 1)
 
         p = model.calculate_p(
             theta = dummy_theta,
@@ -376,10 +591,10 @@ class TestGradient():
 
         model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
 
-        # set m as it is usually set in fit
-        model.m, model.n = self.X.shape
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
 
-        dummy_theta = np.zeros(self.X.shape[1])
+        dummy_theta = np.zeros(self.X.shape[1] + 1)
 
         grad = model.gradient(
             theta = dummy_theta,
@@ -387,7 +602,8 @@ class TestGradient():
             y = self.y
         )
 
-        assert grad.shape == (self.X.shape[1], ), 'Incorrect shape for gradient output'
+        assert grad.shape == (self.X.shape[1] + 1, ), 'Incorrect shape for gradient output'
+
 
 
 
@@ -399,8 +615,8 @@ class TestGradient():
         GroupMeanEqualisingRegression,   
     ]
 )
-class TestSigmoid():
-    """Tests for the sigmoid method on model classes."""
+class TestLossAndGrad():
+    """Tests for the loss_and_grad method on model classes."""
 
     def setup_class(self):
         """Load data to build models on."""
@@ -408,17 +624,72 @@ class TestSigmoid():
         adult = ad.data.get_data()
         self.X, self.y = ad.data.data_to_np(adult)
 
+        # standardise so finite difference gradients are accurate
+        self.X = StandardScaler().fit_transform(self.X)
 
-    def test_return_shape(self, cls):
-        """Test return value is the correct shape."""
+
+    def test_consistent_with_cost_function_and_gradient(self, cls):
+        """Test the cost and gradient returned are equal to cost_function and gradient."""
 
         model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
 
-        sigmoid_X = model.sigmoid(
-            z = self.X
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
+
+        np.random.seed(2)
+        theta = np.random.normal(scale = 0.1, size = self.X.shape[1] + 1)
+
+        J, grad = model.loss_and_grad(theta = theta, X = self.X, y = self.y)
+
+        assert J == model.cost_function(theta = theta, X = self.X, y = self.y), \
+            'cost from loss_and_grad not equal to cost_function'
+
+        assert_array_equal(grad, model.gradient(theta = theta, X = self.X, y = self.y))
+
+
+    def test_gradient_matches_finite_differences(self, cls):
+        """Test the gradient returned matches finite difference approximation of the cost."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        if cls is not LogisticRegression:
+
+            model.lambda_ = 10
+
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
+
+        np.random.seed(2)
+        theta = np.random.normal(scale = 0.1, size = self.X.shape[1] + 1)
+
+        _, grad = model.loss_and_grad(theta = theta, X = self.X, y = self.y)
+
+        approx_grad = scipy.optimize.approx_fprime(
+            theta, 
+            lambda t: model.loss_and_grad(theta = t, X = self.X, y = self.y)[0], 
+            1e-7
         )
 
-        assert sigmoid_X.shape == self.X.shape, 'Incorrect shape for sigmoid output'
+        assert_almost_equal(grad, approx_grad, decimal = 5)
+
+
+
+    def test_finite_for_large_linear_predictor(self, cls):
+        """Test the cost and gradient are finite when predictions are 0 or 1 to machine precision."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
+
+        theta = np.full(self.X.shape[1] + 1, 100.0)
+
+        J, grad = model.loss_and_grad(theta = theta, X = self.X, y = self.y)
+
+        assert np.isfinite(J), 'cost is not finite for large linear predictor values'
+
+        assert np.all(np.isfinite(grad)), 'gradient is not finite for large linear predictor values'
+
 
 
 
@@ -430,8 +701,8 @@ class TestSigmoid():
         GroupMeanEqualisingRegression,   
     ]
 )
-class TestPredictProba():
-    """Tests for the predict_proba method on model classes."""
+class TestHessian():
+    """Tests for the hessian method on model classes."""
 
     def setup_class(self):
         """Load data to build models on."""
@@ -439,17 +710,1151 @@ class TestPredictProba():
         adult = ad.data.get_data()
         self.X, self.y = ad.data.data_to_np(adult)
 
+        # standardise so finite difference gradients are accurate
+        self.X = StandardScaler().fit_transform(self.X)
+
 
     def test_return_shape(self, cls):
         """Test return value is the correct shape."""
 
         model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
 
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
+
+        dummy_theta = np.zeros(self.X.shape[1] + 1)
+
+        H = model.hessian(
+            theta = dummy_theta,
+            X = self.X, 
+            y = self.y
+        )
+
+        assert H.shape == (self.X.shape[1] + 1, self.X.shape[1] + 1), 'Incorrect shape for hessian output'
+
+
+    def test_hessian_matches_finite_differences(self, cls):
+        """Test the hessian matches finite difference approximation of the gradient.
+        
+        GroupMeanEqualisingRegression uses the Gauss-Newton approximation for the penalty 
+        so is only checked with lambda_ = 0.
+        """
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        if cls is RidgeRegression:
+
+            model.lambda_ = 10
+
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
+
+        np.random.seed(2)
+        theta = np.random.normal(scale = 0.1, size = self.X.shape[1] + 1)
+
+        H = model.hessian(theta = theta, X = self.X, y = self.y)
+
+        approx_H = np.array(
+            [
+                scipy.optimize.approx_fprime(
+                    theta, 
+                    lambda t: model.loss_and_grad(theta = t, X = self.X, y = self.y)[1][j], 
+                    1e-7
+                )
+                for j in range(theta.shape[0])
+            ]
+        )
+
+        assert_almost_equal(H, approx_H, decimal = 5)
+
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+class TestSparseInput():
+    """Tests for fitting and predicting with scipy.sparse X."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    @pytest.mark.parametrize("sparse_format", [scipy.sparse.csr_matrix, scipy.sparse.csc_matrix])
+    @pytest.mark.parametrize("standardise", [True, False])
+    def test_coefficients_equal_to_dense(self, cls, sparse_format, standardise):
+        """Test coefficients from sparse X are the same as from dense X."""
+
+        model = initialise_model(cls = cls, standardise = standardise, fit_intercept = True)
+
+        model.solver = 'newton'
+
+        model.fit(self.X, self.y)
+
+        sparse_model = initialise_model(cls = cls, standardise = standardise, fit_intercept = True)
+
+        sparse_model.solver = 'newton'
+
+        sparse_model.fit(sparse_format(self.X), self.y)
+
+        assert_almost_equal(
+            sparse_model.coefficients['coef'].to_numpy(),
+            model.coefficients['coef'].to_numpy(),
+            decimal = 8
+        )
+
+
+    @pytest.mark.parametrize(
+        "kwargs,expected_format", 
+        [
+            ({}, 'csc'), 
+            ({'chunk_size': 1000}, 'csr'),
+            ({'n_jobs': 2}, 'csr'),
+            ({'dtype': np.float32}, 'csr'),
+            ({'dtype': np.float32, 'solver': 'newton'}, 'csc')
+        ]
+    )
+    def test_csc_converted_when_rows_sliced(self, cls, kwargs, expected_format):
+        """Test CSC X is converted to CSR if its rows are sliced into chunks and kept as CSC otherwise."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        for name, value in kwargs.items():
+
+            setattr(model, name, np.dtype(value) if name == 'dtype' else value)
+
+        assert model.prepare_X(scipy.sparse.csc_matrix(self.X)).format == expected_format
+
+
+    def test_implicit_standardisation(self, cls):
+        """Test cost and gradient with implicit standardisation of sparse X equal those for standardised dense X."""
+
+        scaler = StandardScaler().fit(self.X)
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        if cls is not LogisticRegression:
+
+            model.lambda_ = 10
+
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
+
+        np.random.seed(2)
+        theta = np.random.normal(scale = 0.1, size = self.X.shape[1] + 1)
+
+        J, grad = model.loss_and_grad(theta = theta, X = scaler.transform(self.X), y = self.y)
+
+        H = model.hessian(theta = theta, X = scaler.transform(self.X), y = self.y)
+
+        # centring and scaling applied in the linear predictor, as set in fit for sparse X
+        model.x_mean, model.x_scale = scaler.mean_, scaler.scale_
+
+        sparse_J, sparse_grad = model.loss_and_grad(theta = theta, X = scipy.sparse.csr_matrix(self.X), y = self.y)
+
+        sparse_H = model.hessian(theta = theta, X = scipy.sparse.csr_matrix(self.X), y = self.y)
+
+        assert_almost_equal(sparse_J, J, decimal = 10)
+
+        assert_almost_equal(sparse_grad, grad, decimal = 10)
+
+        assert_almost_equal(sparse_H, H, decimal = 10)
+
+
+    def test_predict_proba_equal_to_dense(self, cls):
+        """Test predictions for sparse X are the same as for dense X."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
         model.fit(self.X, self.y)
 
-        predictions = model.predict_proba(self.X)
+        assert_almost_equal(
+            model.predict_proba(scipy.sparse.csr_matrix(self.X)),
+            model.predict_proba(self.X),
+            decimal = 12
+        )
 
-        assert predictions.shape == (self.X.shape[0], 1), 'Incorrect shape for predict_proba output'
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+class TestChunkedFit():
+    """Tests for fitting with X processed in chunks of rows, optionally on a thread pool."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    def test_loss_and_grad_equal_to_unchunked(self, cls):
+        """Test cost, gradient and hessian accumulated over chunks equal those calculated on all rows at once."""
+
+        model = initialise_model(cls = cls, standardise = False, fit_intercept = True)
+
+        if cls is not LogisticRegression:
+
+            model.lambda_ = 10
+
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
+
+        np.random.seed(2)
+        theta = np.random.normal(scale = 0.01, size = self.X.shape[1] + 1)
+
+        J, grad = model.loss_and_grad(theta = theta, X = self.X, y = self.y)
+
+        H = model.hessian(theta = theta, X = self.X, y = self.y)
+
+        # chunk size that does not divide the number of rows
+        model.chunk_size = 1000
+
+        chunked_J, chunked_grad = model.loss_and_grad(theta = theta, X = self.X, y = self.y)
+
+        chunked_H = model.hessian(theta = theta, X = self.X, y = self.y)
+
+        assert_almost_equal(chunked_J, J, decimal = 10)
+
+        assert_almost_equal(chunked_grad, grad, decimal = 10)
+
+        assert_almost_equal(chunked_H, H, decimal = 10)
+
+
+    @pytest.mark.parametrize("n_jobs", [2, -1])
+    def test_threads_equal_to_single_thread(self, cls, n_jobs):
+        """Test cost, gradient and hessian calculated on a thread pool are identical to a single thread for the same chunks."""
+
+        model = initialise_model(cls = cls, standardise = False, fit_intercept = True)
+
+        if cls is not LogisticRegression:
+
+            model.lambda_ = 10
+
+        # set m and n as they are usually set in fit, n includes the intercept
+        model.m, model.n = self.X.shape[0], self.X.shape[1] + 1
+
+        model.chunk_size = 1000
+
+        np.random.seed(2)
+        theta = np.random.normal(scale = 0.01, size = self.X.shape[1] + 1)
+
+        J, grad = model.loss_and_grad(theta = theta, X = self.X, y = self.y)
+
+        H = model.hessian(theta = theta, X = self.X, y = self.y)
+
+        model.n_jobs = n_jobs
+
+        threaded_J, threaded_grad = model.loss_and_grad(theta = theta, X = self.X, y = self.y)
+
+        threaded_H = model.hessian(theta = theta, X = self.X, y = self.y)
+
+        assert threaded_J == J
+
+        assert_array_equal(threaded_grad, grad)
+
+        assert_array_equal(threaded_H, H)
+
+
+    def test_threads_without_chunk_size(self, cls):
+        """Test coefficients with rows split between threads are the same as a single thread fit."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = 'newton'
+
+        model.fit(self.X, self.y)
+
+        threaded_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        threaded_model.solver = 'newton'
+
+        threaded_model.n_jobs = 4
+
+        threaded_model.fit(self.X, self.y)
+
+        assert_almost_equal(
+            threaded_model.coefficients['coef'].to_numpy(),
+            model.coefficients['coef'].to_numpy(),
+            decimal = 8
+        )
+
+
+    @pytest.mark.parametrize("solver", ['tnc', 'newton'])
+    def test_one_thread_pool_per_fit(self, cls, solver, mocker):
+        """Test a single thread pool is used for all cost, gradient and Hessian evaluations in fit."""
+
+        spy = mocker.spy(ad.logistic_regression.base, 'ThreadPoolExecutor')
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = solver
+
+        model.n_jobs = 4
+
+        model.fit(self.X, self.y)
+
+        assert model.optimisation_results['nfev'] > 1
+
+        assert spy.call_count == 1, 'thread pool started for more than one evaluation'
+
+        assert model.executor is None, 'thread pool not shut down after fit'
+
+
+    @pytest.mark.parametrize("solver", ['tnc', 'newton'])
+    def test_coefficients_equal_to_in_memory(self, cls, solver):
+        """Test coefficients from a chunked fit are the same as from fitting on all rows at once."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = solver
+
+        model.fit(self.X, self.y)
+
+        chunked_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        chunked_model.solver = solver
+
+        chunked_model.chunk_size = 5000
+
+        chunked_model.fit(self.X, self.y)
+
+        assert_almost_equal(
+            chunked_model.coefficients['coef'].to_numpy(),
+            model.coefficients['coef'].to_numpy(),
+            decimal = 6
+        )
+
+
+    def test_npy_file(self, cls, tmp_path):
+        """Test X can be given as a path to a .npy file, which is memory-mapped."""
+
+        X_file = tmp_path / 'X.npy'
+
+        np.save(X_file, self.X)
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = 'newton'
+
+        model.fit(self.X, self.y)
+
+        file_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        file_model.solver = 'newton'
+
+        file_model.chunk_size = 5000
+
+        file_model.fit(str(X_file), self.y)
+
+        assert_almost_equal(
+            file_model.coefficients['coef'].to_numpy(),
+            model.coefficients['coef'].to_numpy(),
+            decimal = 8
+        )
+
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+class TestFloat32():
+    """Tests for fitting and predicting with dtype np.float32."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    @pytest.mark.parametrize("solver", ['tnc', 'newton'])
+    @pytest.mark.parametrize("shift", [0, 1e4])
+    def test_coefficients_close_to_float64(self, cls, solver, shift):
+        """Test coefficients fit in float32 are close to those fit in float64, including with a column with a large mean."""
+
+        X = self.X.astype(np.float64)
+
+        X[:, 0] += shift
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = solver
+
+        model.fit(X, self.y)
+
+        float32_model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        float32_model.solver = solver
+
+        float32_model.dtype = np.dtype(np.float32)
+
+        float32_model.fit(X.astype(np.float32), self.y)
+
+        assert float32_model.optimisation_results['success']
+
+        assert_almost_equal(
+            float32_model.coefficients['std_coef'].to_numpy(),
+            model.coefficients['std_coef'].to_numpy(),
+            decimal = 4
+        )
+
+
+    def test_float32_not_upcast(self, cls, mocker):
+        """Test float32 X is passed to the optimiser without copying and predictions are float32."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.dtype = np.dtype(np.float32)
+
+        X = self.X.astype(np.float32)
+
+        spy = mocker.spy(scipy.optimize, 'minimize')
+
+        model.fit(X, self.y)
+
+        call_kwargs = spy.call_args_list[0][1]
+
+        assert call_kwargs['args'][0] is X, 'float32 X copied before optimisation'
+
+        z = model.linear_predictor(model.optimisation_results['x'], X)
+
+        assert z.dtype == np.float32, 'linear predictor upcast from float32'
+
+        assert model.predict_proba(X).dtype == np.float32, 'predictions upcast from float32'
+
+
+    def test_dtype_value_error(self, cls):
+        """Test an exception is raised if dtype is not float32 or float64."""
+
+        kwargs = {'group': np.array([0, 1])} if cls is GroupMeanEqualisingRegression else {}
+
+        with pytest.raises(ValueError):
+
+            cls(dtype = np.int64, **kwargs)
+
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+class TestSampleWeight():
+    """Tests for fitting with sample_weight."""
+
+    def setup_class(self):
+        """Create data with many duplicated rows."""
+
+        np.random.seed(4)
+        self.X = np.random.randint(0, 4, size = (5000, 3)).astype(float)
+        self.y = (np.random.rand(5000) < 1 / (1 + np.exp(-self.X[:, 0] + 1.5))).astype(int)
+        self.group = (self.X[:, 1] > 1).astype(int)
+
+
+    def initialise(self, cls, group):
+        """Initialise model with the newton solver and a penalty."""
+
+        if cls is GroupMeanEqualisingRegression:
+
+            return cls(group = group, lambda_ = 1, solver = 'newton')
+
+        elif cls is RidgeRegression:
+
+            return cls(lambda_ = 10, solver = 'newton')
+
+        return cls(solver = 'newton')
+
+
+    def test_deduplicated_fit_equal_to_full_fit(self, cls):
+        """Test fitting on deduplicated rows weighted by their counts gives the same coefficients as fitting on all rows."""
+
+        model = self.initialise(cls, self.group)
+
+        model.fit(self.X, self.y)
+
+        X_unique, y_unique, group_unique, sample_weight = ad.data.deduplicate(self.X, self.y, self.group)
+
+        assert X_unique.shape[0] < self.X.shape[0] / 10, 'rows not deduplicated'
+
+        assert sample_weight.sum() == self.X.shape[0], 'counts do not sum to number of rows'
+
+        weighted_model = self.initialise(cls, group_unique)
+
+        weighted_model.fit(X_unique, y_unique, sample_weight = sample_weight)
+
+        assert_almost_equal(
+            weighted_model.coefficients['coef'].to_numpy(),
+            model.coefficients['coef'].to_numpy(),
+            decimal = 8
+        )
+
+
+    def test_sample_weight_equal_to_repeated_rows(self, cls):
+        """Test integer sample weights give the same coefficients as repeating rows, with chunking."""
+
+        np.random.seed(5)
+        sample_weight = np.random.randint(1, 4, size = self.X.shape[0])
+
+        repeated = np.repeat(np.arange(self.X.shape[0]), sample_weight)
+
+        model = self.initialise(cls, self.group[repeated])
+
+        model.fit(self.X[repeated], self.y[repeated])
+
+        weighted_model = self.initialise(cls, self.group)
+
+        weighted_model.chunk_size = 1000
+
+        weighted_model.fit(self.X, self.y, sample_weight = sample_weight)
+
+        assert_almost_equal(
+            weighted_model.coefficients['coef'].to_numpy(),
+            model.coefficients['coef'].to_numpy(),
+            decimal = 8
+        )
+
+
+    def test_sample_weight_length_error(self, cls):
+        """Test an exception is raised if sample_weight is not the same length as X."""
+
+        model = self.initialise(cls, self.group)
+
+        with pytest.raises(ValueError):
+
+            model.fit(self.X, self.y, sample_weight = np.ones(10))
+
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+@pytest.mark.parametrize("solver", ['tnc', 'newton'])
+class TestProfile():
+    """Tests for the profile recorded in fit and the fit callback."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    def test_profile_counts(self, cls, solver):
+        """Test the profile counts each evaluation of the cost and gradient and has a trace entry for each iteration."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = solver
+
+        model.fit(self.X, self.y)
+
+        profile = model.profile
+
+        assert profile['calls']['loss_and_grad'] == model.optimisation_results['nfev']
+
+        assert profile['calls']['standardise'] == 1
+
+        assert set(['standardise', 'optimise', 'extract_coefficients', 'loss_and_grad']) <= set(profile['time'])
+
+        assert len(profile['trace']) > 0
+
+        assert profile['trace'][-1]['iteration'] == len(profile['trace'])
+
+        assert profile['trace'][-1]['grad_norm'] < profile['trace'][0]['grad_norm']
+
+        if solver == 'newton':
+
+            assert profile['calls']['hessian'] == model.optimisation_results['nhev']
+
+
+    def test_profile_not_updated_after_fit(self, cls, solver):
+        """Test calls after fit are not added to the profile."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = solver
+
+        model.fit(self.X, self.y)
+
+        calls = dict(model.profile['calls'])
+
+        model.predict_proba(self.X)
+
+        assert model.profile['calls'] == calls
+
+
+    def test_callback_early_stopping(self, cls, solver):
+        """Test the callback is called each iteration and returning True stops the optimisation."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = solver
+
+        iterations = []
+
+        def callback(info):
+
+            iterations.append(info['iteration'])
+
+            return info['iteration'] == 2
+
+        model.fit(self.X, self.y, callback = callback)
+
+        assert iterations == [1, 2]
+
+        assert not model.optimisation_results['success']
+
+        assert model.optimisation_results['nit'] == 2
+
+        assert_array_equal(model.coefficients['std_coef'].to_numpy(), model.optimisation_results['x'])
+
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+class TestStandardErrors():
+    """Tests for the standard errors calculated in fit."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    def test_same_for_solvers(self, cls):
+        """Test the tnc solver, which calculates the Hessian after fitting, gives the same standard errors as newton."""
+
+        tables = []
+
+        for solver in ['tnc', 'newton']:
+
+            model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+            model.solver = solver
+
+            model.standard_errors = True
+
+            model.chunk_size = 10000
+
+            model.fit(self.X, self.y)
+
+            tables.append(model.coefficients)
+
+        # tnc stops further from the optimum than newton, so the Hessians differ slightly
+        assert_almost_equal(tables[0]['std_se'].to_numpy() / tables[1]['std_se'].to_numpy(), np.ones(len(tables[0])), decimal = 2)
+
+
+    def test_standardised_scale(self, cls):
+        """Test standard errors of coefficients other than the intercept are the standardised standard errors divided by the scale of X."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.solver = 'newton'
+
+        model.standard_errors = True
+
+        model.fit(self.X, self.y)
+
+        assert_almost_equal(
+            model.coefficients['se'].to_numpy()[1:], 
+            model.coefficients['std_se'].to_numpy()[1:] / model.x_scale, 
+            decimal = 12
+        )
+
+        # z-scores do not depend on the scale of X, other than for the intercept
+        assert_almost_equal(
+            model.coefficients['z'].to_numpy()[1:], 
+            (model.coefficients['std_coef'] / model.coefficients['std_se']).to_numpy()[1:], 
+            decimal = 6
+        )
+
+
+    def test_not_calculated_by_default(self, cls):
+        """Test standard errors are not calculated unless standard_errors is True."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        assert 'se' not in model.coefficients
+
+
+
+class TestRidgePath():
+    """Tests for the RidgeRegression.ridge_path method."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    def test_coefficients_equal_to_independent_fits(self):
+        """Test warm started coefficients are the same as fitting the model separately for each lambda."""
+
+        lambdas = [1000, 100, 10]
+
+        model = RidgeRegression(solver = 'newton')
+
+        coefficients, diagnostics = model.ridge_path(self.X, self.y, lambdas)
+
+        for lambda_ in lambdas:
+
+            lambda_model = RidgeRegression(solver = 'newton', lambda_ = lambda_)
+
+            lambda_model.fit(self.X, self.y)
+
+            assert_almost_equal(
+                coefficients.loc[lambda_].to_numpy(),
+                lambda_model.coefficients['coef'].to_numpy(),
+                decimal = 4
+            )
+
+
+    def test_return_shapes(self):
+        """Test a row of coefficients and diagnostics is returned for each lambda."""
+
+        lambdas = iter([100, 10])
+
+        model = RidgeRegression()
+
+        coefficients, diagnostics = model.ridge_path(self.X, self.y, lambdas)
+
+        assert coefficients.shape == (2, self.X.shape[1] + 1), 'Incorrect shape for coefficients'
+
+        assert list(coefficients.columns) == model.coefficient_names, 'Incorrect coefficients columns'
+
+        assert list(diagnostics['lambda_']) == [100, 10], 'Incorrect lambdas in diagnostics'
+
+        assert diagnostics['success'].all(), 'Optimiser did not converge'
+
+        assert model.lambda_ == 10, 'Model not left fit with the last lambda'
+
+
+    def test_empty_lambdas_error(self):
+        """Test an exception is raised if lambdas is empty."""
+
+        with pytest.raises(ValueError):
+
+            RidgeRegression().ridge_path(self.X, self.y, [])
+
+
+    def test_standard_errors_error(self):
+        """Test an exception is raised if the model is created with standard_errors = True, as they are not calculated."""
+
+        with pytest.raises(ValueError):
+
+            RidgeRegression(standard_errors = True).ridge_path(self.X, self.y, [10, 1])
+
+
+
+class TestEncodeGroup():
+    """Tests for the GroupMeanEqualisingRegression group encoding and multi-level penalty."""
+
+    def test_binary_group_mean_difference(self):
+        """Test the counts and difference in group means for a group with 2 levels."""
+
+        np.random.seed(3)
+        group = (np.random.rand(1000) > 0.3).astype(int)
+        p = np.random.rand(1000)
+
+        model = GroupMeanEqualisingRegression(group = group)
+
+        assert_array_equal(model.group_counts, [np.sum(group == 0), np.sum(group == 1)])
+
+        assert_almost_equal(
+            model.calculate_group_mean_differences(p, group), 
+            [p[group == 0].mean() - p[group == 1].mean()], 
+            decimal = 12
+        )
+
+
+    @pytest.mark.parametrize("comparison", ['pairwise', 'overall'])
+    def test_multi_attribute_group_mean_differences(self, comparison):
+        """Test the differences in group means for several attributes with several levels."""
+
+        np.random.seed(3)
+        group = np.column_stack([np.random.randint(0, 4, 1000), np.random.choice(['a', 'b', 'c'], 1000)])
+        p = np.random.rand(1000)
+
+        model = GroupMeanEqualisingRegression(group = group, comparison = comparison)
+
+        expected = []
+
+        for attribute in range(group.shape[1]):
+
+            levels = np.unique(group[:, attribute])
+
+            means = [p[group[:, attribute] == level].mean() for level in levels]
+
+            if comparison == 'pairwise':
+
+                expected += [means[i] - means[j] for i in range(len(levels)) for j in range(i + 1, len(levels))]
+
+            else:
+
+                expected += [mean - p.mean() for mean in means]
+
+        assert_almost_equal(model.calculate_group_mean_differences(p, group), expected, decimal = 12)
+
+
+    @pytest.mark.parametrize("comparison", ['pairwise', 'overall'])
+    def test_multi_attribute_gradient_matches_finite_differences(self, comparison):
+        """Test the penalised gradient matches finite difference approximation of the cost for several attributes."""
+
+        np.random.seed(3)
+        X = np.random.normal(size = (500, 3))
+        y = (np.random.rand(500) > 0.5).astype(int)
+        group = np.column_stack([np.random.randint(0, 5, 500), (X[:, 0] > 0).astype(int)])
+
+        model = GroupMeanEqualisingRegression(group = group, lambda_ = 10, comparison = comparison)
+
+        model.m, model.n = X.shape[0], X.shape[1] + 1
+
+        theta = np.random.normal(scale = 0.5, size = X.shape[1] + 1)
+
+        _, grad = model.loss_and_grad(theta = theta, X = X, y = y)
+
+        approx_grad = scipy.optimize.approx_fprime(
+            theta, 
+            lambda t: model.loss_and_grad(theta = t, X = X, y = y)[0], 
+            1e-7
+        )
+
+        assert_almost_equal(grad, approx_grad, decimal = 5)
+
+
+    def test_penalty_reduces_group_mean_differences(self):
+        """Test fitting with the penalty reduces the differences in group means for a multi-level group."""
+
+        np.random.seed(3)
+        X = np.random.normal(size = (2000, 3))
+        y = (np.random.rand(2000) < 1 / (1 + np.exp(-X[:, 0]))).astype(int)
+        group = np.digitize(X[:, 0], [-1, 0, 1])
+
+        d = []
+
+        for lambda_ in [0, 10]:
+
+            model = GroupMeanEqualisingRegression(group = group, lambda_ = lambda_, solver = 'newton')
+
+            model.fit(X, y)
+
+            d.append(model.calculate_group_mean_differences(model.predict_proba(X)[:, 0], group))
+
+        assert np.all(np.abs(d[1]) < np.abs(d[0])), 'penalty does not reduce group mean differences'
+
+
+    def test_unknown_level_in_batch(self):
+        """Test an exception is raised if a mini-batch has a group level not in the group the model was created with."""
+
+        model = GroupMeanEqualisingRegression(group = np.array([0, 1, 2, 0]))
+
+        with pytest.raises(ValueError):
+
+            model.partial_fit(np.ones((2, 2)), np.array([0, 1]), np.array([0, 3]))
+
+
+    def test_comparison_value_error(self):
+        """Test an exception is raised if comparison is not a valid value."""
+
+        with pytest.raises(ValueError):
+
+            GroupMeanEqualisingRegression(group = np.array([0, 1]), comparison = 'max')
+
+
+    def test_row_level_encoding_deleted_after_fit(self):
+        """Test group and the row level encoding are not kept after fitting."""
+
+        np.random.seed(3)
+        X = np.random.normal(size = (200, 3))
+        y = (np.random.rand(200) > 0.5).astype(int)
+        group = (np.random.rand(200) > 0.5).astype(int)
+
+        model = GroupMeanEqualisingRegression(group = group, lambda_ = 1)
+
+        model.fit(X, y)
+
+        for attribute in ['group', 'group_codes']:
+
+            assert not hasattr(model, attribute), f'{attribute} not deleted after fit'
+
+
+
+class TestFrontier():
+    """Tests for the GroupMeanEqualisingRegression.frontier method."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+        # group related to the response so the penalty changes the model
+        self.group = (self.X[:, 0] > np.median(self.X[:, 0])).astype(int)
+
+
+    def test_frontier_columns(self):
+        """Test the frontier table has a row for each lambda and the expected columns."""
+
+        model = GroupMeanEqualisingRegression(group = self.group, solver = 'newton')
+
+        frontier = model.frontier(self.X, self.y, [0, 1])
+
+        assert frontier.shape[0] == 2, 'Incorrect number of rows in frontier'
+
+        assert list(frontier.columns) == ['lambda_', 'log_loss', 'd', 'success'] + model.coefficient_names
+
+        assert model.lambda_ == 1, 'Model not left fit with the last lambda'
+
+
+    def test_penalty_reduces_group_mean_difference(self):
+        """Test larger lambdas give smaller group mean differences and larger log loss."""
+
+        model = GroupMeanEqualisingRegression(group = self.group, solver = 'newton')
+
+        frontier = model.frontier(self.X, self.y, [0, 0.1, 1])
+
+        assert np.all(np.diff(np.abs(frontier['d'])) < 0), 'd does not decrease with lambda'
+
+        assert np.all(np.diff(frontier['log_loss']) > 0), 'log loss does not increase with lambda'
+
+
+    @pytest.mark.parametrize("n_jobs", [1, 2])
+    def test_warm_start_equal_to_independent_fits(self, n_jobs):
+        """Test warm started fits give the same frontier as independent fits, run in parallel or not."""
+
+        lambdas = [0, 0.1, 1]
+
+        model = GroupMeanEqualisingRegression(group = self.group, solver = 'newton')
+
+        frontier = model.frontier(self.X, self.y, lambdas)
+
+        independent_model = GroupMeanEqualisingRegression(group = self.group, solver = 'newton', n_jobs = n_jobs)
+
+        independent_frontier = independent_model.frontier(self.X, self.y, lambdas, warm_start = False)
+
+        assert_almost_equal(
+            independent_frontier[['log_loss', 'd']].to_numpy(),
+            frontier[['log_loss', 'd']].to_numpy(),
+            decimal = 4
+        )
+
+        fit_model = GroupMeanEqualisingRegression(group = self.group, solver = 'newton', lambda_ = 1)
+
+        fit_model.fit(self.X, self.y)
+
+        assert_almost_equal(
+            independent_model.coefficients['coef'].to_numpy(),
+            fit_model.coefficients['coef'].to_numpy(),
+            decimal = 8
+        )
+
+
+    @pytest.mark.parametrize("warm_start", [True, False])
+    def test_empty_lambdas_error(self, warm_start):
+        """Test an exception is raised if lambdas is empty."""
+
+        model = GroupMeanEqualisingRegression(group = self.group)
+
+        with pytest.raises(ValueError):
+
+            model.frontier(self.X, self.y, [], warm_start = warm_start)
+
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+class TestSigmoid():
+    """Tests for the sigmoid method on model classes."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    def test_return_shape(self, cls):
+        """Test return value is the correct shape."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        sigmoid_X = model.sigmoid(
+            z = self.X
+        )
+
+        assert sigmoid_X.shape == self.X.shape, 'Incorrect shape for sigmoid output'
+
+
+    def test_extreme_values(self, cls):
+        """Test sigmoid of large magnitude values is 0 or 1 rather than nan."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        sigmoid_z = model.sigmoid(
+            z = np.array([-1000.0, 0.0, 1000.0])
+        )
+
+        assert_array_equal(sigmoid_z, np.array([0.0, 0.5, 1.0]))
+
+
+    @pytest.mark.parametrize("z", [0, 0.0, np.float64(0), np.array(0.0)])
+    def test_scalar_input(self, cls, z):
+        """Test the sigmoid of a scalar or 0-d array is returned as a float64 scalar."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        sigmoid_z = model.sigmoid(z = z)
+
+        assert np.ndim(sigmoid_z) == 0
+
+        assert sigmoid_z.dtype == np.float64
+
+        assert sigmoid_z == 0.5
+
+        assert_almost_equal(model.sigmoid(z = -1000), 0.0)
+
+
+
+@pytest.mark.parametrize(
+    "cls", 
+    [
+        LogisticRegression, 
+        RidgeRegression, 
+        GroupMeanEqualisingRegression,   
+    ]
+)
+class TestPredictProba():
+    """Tests for the predict_proba method on model classes."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    def test_return_shape(self, cls):
+        """Test return value is the correct shape."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        predictions = model.predict_proba(self.X)
+
+        assert predictions.shape == (self.X.shape[0], 1), 'Incorrect shape for predict_proba output'
+
+
+    @pytest.mark.parametrize("batch_size", [None, 1000, 10 ** 6])
+    @pytest.mark.parametrize(
+        "output,expected_shape", 
+        [
+            ('column', (32560, 1)), 
+            ('flat', (32560, )),
+            ('sklearn', (32560, 2))
+        ]
+    )
+    def test_batches_and_outputs(self, cls, batch_size, output, expected_shape):
+        """Test predictions in batches and in each output shape equal predictions on all rows at once."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        expected = model.sigmoid(model.linear_predictor(model.optimisation_results['x'], self.X.astype(float)))
+
+        predictions = model.predict_proba(self.X, batch_size = batch_size, output = output)
+
+        assert predictions.shape == expected_shape, 'Incorrect shape for predict_proba output'
+
+        assert_almost_equal(predictions[:, -1] if predictions.ndim == 2 else predictions, expected, decimal = 12)
+
+        if output == 'sklearn':
+
+            assert_almost_equal(predictions.sum(axis = 1), 1, decimal = 12)
+
+
+    def test_out_buffer(self, cls):
+        """Test predictions are written into out when it is given."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        out = np.empty(self.X.shape[0])
+
+        predictions = model.predict_proba(self.X, batch_size = 5000, out = out, output = 'flat')
+
+        assert predictions is out, 'out not returned'
+
+        assert_array_equal(out, model.predict_proba(self.X)[:, 0])
+
+        with pytest.raises(ValueError):
+
+            model.predict_proba(self.X, out = out, output = 'column')
+
+
+    @pytest.mark.parametrize(
+        "batch_size,error", 
+        [
+            (0, ValueError), 
+            (-1, ValueError),
+            (1000.0, TypeError)
+        ]
+    )
+    def test_batch_size_error(self, cls, batch_size, error):
+        """Test an exception is raised if batch_size is not an int of at least 1."""
+
+        model = initialise_model(cls = cls, standardise = True, fit_intercept = True)
+
+        model.fit(self.X, self.y)
+
+        with pytest.raises(error):
+
+            model.predict_proba(self.X, batch_size = batch_size)
 
 
 
@@ -49,7 +49,13 @@ def test_class_inheritance(cls):
     [
         'fit',
         'cost_function',
-        'gradient'        
+        'gradient',
+        'loss_and_grad',
+        'penalty',
+        'hessian',
+        'penalty_hessian',
+        'partial_fit',
+        'fit_stream'
     ]
 )
 def test_class_methods(cls, name):
@@ -72,12 +78,19 @@ def test_class_methods(cls, name):
 @pytest.mark.parametrize(
     "method_name,expected_args", 
     [
-        ('fit', ['self', 'X', 'y']), 
+        ('fit', ['self', 'X', 'y', 'sample_weight', 'callback']), 
         ('cost_function', ['self', 'theta', 'X', 'y']), 
         ('calculate_p', ['self', 'theta', 'X']), 
         ('gradient', ['self', 'theta', 'X', 'y']),
+        ('loss_and_grad', ['self', 'theta', 'X', 'y']),
+        ('chunk_loss_and_grad', ['self', 'theta', 'X', 'y', 'rows']),
+        ('penalty_statistics', ['self', 'theta', 'X', 'p', 'rows']),
+        ('penalty', ['self', 'theta', 'statistics']),
+        ('hessian', ['self', 'theta', 'X', 'y']),
+        ('chunk_hessian', ['self', 'theta', 'X', 'rows']),
+        ('penalty_hessian', ['self', 'theta', 'statistics']),
         ('sigmoid', ['self', 'z']),
-        ('predict_proba', ['self', 'X'])
+        ('predict_proba', ['self', 'X', 'batch_size', 'out', 'output'])
     ]
 )
 def test_fit_args(cls, method_name, expected_args):
@@ -0,0 +1,153 @@
+import numpy as np
+
+import pytest
+from numpy.testing import assert_almost_equal, assert_array_equal
+
+import adiscriminator as ad
+from adiscriminator.logistic_regression.ridge import RidgeRegression
+from adiscriminator.logistic_regression.fair import GroupMeanEqualisingRegression
+from adiscriminator.logistic_regression.cross_validation import cross_validate
+
+
+
+def load_data(m = 5000):
+    """Function to load the first m rows of the sparse adult design matrix with sex as group."""
+
+    adult = ad.data.get_data()
+
+    X, y, group, _ = ad.data.data_to_sparse(adult.iloc[:m])
+
+    return X.toarray(), y, group
+
+
+@pytest.mark.parametrize(
+    "make_model", 
+    [
+        lambda group: RidgeRegression(solver = 'newton'),
+        lambda group: GroupMeanEqualisingRegression(group = group, solver = 'newton')
+    ]
+)
+class TestCrossValidate():
+    """Tests for cross_validate."""
+
+    def setup_class(self):
+        """Load data to cross validate models on."""
+
+        self.X, self.y, self.group = load_data()
+
+
+    def test_equal_to_fold_fits(self, make_model):
+        """Test the out of fold log loss and group mean difference equal those of models fit on each fold."""
+
+        lambdas = [0.1, 10]
+
+        results = cross_validate(make_model(self.group), self.X, self.y, lambdas, n_splits = 3, random_state = 0)
+
+        assert len(results) == 3 * len(lambdas)
+
+        folds = np.array_split(np.random.default_rng(0).permutation(self.X.shape[0]), 3)
+
+        for fold, test_rows in enumerate(folds):
+
+            train = np.ones(self.X.shape[0], dtype = bool)
+
+            train[test_rows] = False
+
+            for lambda_ in lambdas:
+
+                model = make_model(self.group[train])
+
+                model.lambda_ = lambda_
+
+                model.fit(self.X[train], self.y[train])
+
+                p = model.predict_proba(self.X[test_rows])[:, 0]
+
+                y = self.y[test_rows]
+
+                log_loss = -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))
+
+                row = results[(results['fold'] == fold) & (results['lambda_'] == lambda_)].iloc[0]
+
+                assert_almost_equal(row['log_loss'], log_loss, decimal = 5)
+
+                if isinstance(model, GroupMeanEqualisingRegression):
+
+                    d = model.calculate_group_mean_differences(p, self.group[test_rows])
+
+                    assert_almost_equal(row['d'], d[np.argmax(np.abs(d))], decimal = 5)
+
+
+    def test_sample_weight_equal_to_repeated_rows(self, make_model):
+        """Test the out of fold log loss and group mean difference with counts as sample_weight equal those with the rows repeated."""
+
+        sample_weight = np.random.default_rng(2).integers(1, 4, size = self.X.shape[0])
+
+        results = cross_validate(make_model(self.group), self.X, self.y, [1], n_splits = 2, sample_weight = sample_weight, random_state = 0)
+
+        folds = np.array_split(np.random.default_rng(0).permutation(self.X.shape[0]), 2)
+
+        for fold, test_rows in enumerate(folds):
+
+            train = np.ones(self.X.shape[0], dtype = bool)
+
+            train[test_rows] = False
+
+            train_rows = np.repeat(np.flatnonzero(train), sample_weight[train])
+
+            test_rows = np.repeat(np.sort(test_rows), sample_weight[np.sort(test_rows)])
+
+            model = make_model(self.group[train_rows])
+
+            model.lambda_ = 1
+
+            model.fit(self.X[train_rows], self.y[train_rows])
+
+            p = model.predict_proba(self.X[test_rows])[:, 0]
+
+            y = self.y[test_rows]
+
+            row = results[results['fold'] == fold].iloc[0]
+
+            assert_almost_equal(row['log_loss'], -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)), decimal = 5)
+
+            if isinstance(model, GroupMeanEqualisingRegression):
+
+                d = model.calculate_group_mean_differences(p, self.group[test_rows])
+
+                assert_almost_equal(row['d'], d[np.argmax(np.abs(d))], decimal = 5)
+
+
+    def test_processes_equal_to_serial(self, make_model):
+        """Test results from a process pool equal those fit in this process."""
+
+        serial = cross_validate(make_model(self.group), self.X, self.y, [1, 10], n_splits = 2, random_state = 1)
+
+        parallel = cross_validate(make_model(self.group), self.X, self.y, [1, 10], n_splits = 2, n_jobs = 2, warm_start = False, random_state = 1)
+
+        assert_array_equal(parallel.columns, serial.columns)
+
+        assert_almost_equal(parallel['log_loss'].to_numpy(), serial['log_loss'].to_numpy(), decimal = 6)
+
+
+
+def test_fit_model_error():
+    """Test an exception is raised for a GroupMeanEqualisingRegression that has been fit, so has no group."""
+
+    X, y, group = load_data(1000)
+
+    model = GroupMeanEqualisingRegression(group = group).fit(X, y)
+
+    with pytest.raises(ValueError):
+
+        cross_validate(model, X, y, [1])
+
+
+def test_empty_lambdas_error():
+    """Test an exception is raised if lambdas is empty."""
+
+    X, y, _ = load_data(1000)
+
+    with pytest.raises(ValueError):
+
+        cross_validate(RidgeRegression(), X, y, [])
@@ -6,13 +6,15 @@ from sklearn.linear_model import LogisticRegression
 from sklearn import preprocessing
 
 from numpy.testing import assert_almost_equal
+import pytest
 
 import adiscriminator as ad
 from adiscriminator import data
 
 
 
-def test_compare_statsmodels_non_reg():
+@pytest.mark.parametrize("solver", ['tnc', 'newton'])
+def test_compare_statsmodels_non_reg(solver):
     """Compare statsmodels logistic regression to non regularised logistic_regression"""
 
     # fix to prevent error with depreceated scipy fcn being used by statsmodels
@@ -24,7 +26,7 @@ def test_compare_statsmodels_non_reg():
 
     adult_X, adult_y = data.data_to_np(adult)
 
-    ad_log_reg = ad.logistic_regression.base.LogisticRegression(fit_intercept = True, standardise = True)
+    ad_log_reg = ad.logistic_regression.base.LogisticRegression(fit_intercept = True, standardise = True, solver = solver)
 
     ad_log_reg.fit(adult_X, adult_y)
 
@@ -39,6 +41,39 @@ def test_compare_statsmodels_non_reg():
                         desired = result.params.tolist(), 
                         decimal = 3)
 
+@pytest.mark.parametrize("standardise", [True, False])
+def test_compare_statsmodels_standard_errors(standardise):
+    """Compare statsmodels standard errors and p-values to those from the Hessian of non regularised logistic_regression"""
+
+    adult = data.get_data()
+
+    adult_X, adult_y = data.data_to_np(adult)
+
+    ad_log_reg = ad.logistic_regression.base.LogisticRegression(
+        fit_intercept = True, 
+        standardise = standardise, 
+        solver = 'newton', 
+        standard_errors = True
+    )
+
+    ad_log_reg.fit(adult_X, adult_y)
+
+    adult_X = np.hstack([np.ones((adult_X.shape[0], 1)), adult_X])
+
+    result = sm.Logit(adult_y, adult_X).fit(disp = 0)
+
+    assert_almost_equal(actual = (ad_log_reg.coefficients['se'] / result.bse).tolist(),
+                        desired = np.ones(adult_X.shape[1]).tolist(), 
+                        decimal = 3)
+
+    assert_almost_equal(actual = ad_log_reg.coefficients['p_value'].tolist(),
+                        desired = result.pvalues.tolist(), 
+                        decimal = 4)
+
+    assert_almost_equal(actual = np.sqrt(np.diag(ad_log_reg.covariance)) / result.bse,
+                        desired = np.ones(adult_X.shape[1]), 
+                        decimal = 3)
+
 def test_compare_sklearn_l2_reg():
     """Compare scikit learn logistic regression to logistic_regression with l2 regularisation and intercept"""
 
@@ -0,0 +1,105 @@
+import pytest
+from numpy.testing import assert_almost_equal
+
+import adiscriminator as ad
+from adiscriminator.logistic_regression.base import LogisticRegression
+from adiscriminator.logistic_regression.ridge import RidgeRegression
+from adiscriminator.logistic_regression.scoring import Scorer, load
+
+
+
+@pytest.mark.parametrize(
+    "cls,kwargs", 
+    [
+        (LogisticRegression, {}), 
+        (LogisticRegression, {'fit_intercept': False}), 
+        (RidgeRegression, {'lambda_': 10, 'standardise': False})
+    ]
+)
+class TestScorer():
+    """Tests for the Scorer class."""
+
+    def setup_class(self):
+        """Load data to build models on."""
+
+        adult = ad.data.get_data()
+        self.X, self.y = ad.data.data_to_np(adult)
+
+
+    def test_predict_proba_equal_to_model(self, cls, kwargs):
+        """Test predictions for an array of rows equal the model's predictions."""
+
+        model = cls(solver = 'newton', **kwargs).fit(self.X, self.y)
+
+        scorer = model.scorer()
+
+        assert_almost_equal(scorer.predict_proba(self.X[:50]), model.predict_proba(self.X[:50])[:, 0], decimal = 12)
+
+
+    def test_score_rows(self, cls, kwargs):
+        """Test predictions for single rows as lists, tuples, arrays and dicts equal the model's predictions."""
+
+        model = cls(solver = 'newton', **kwargs).fit(self.X, self.y)
+
+        names = ['age', 'fnlwgt', 'education_num', 'capital_gain', 'capital_loss', 'hours_per_week']
+
+        scorer = model.scorer(names = names)
+
+        expected = model.predict_proba(self.X[:10])[:, 0]
+
+        for i in range(10):
+
+            row = self.X[i]
+
+            assert_almost_equal(scorer.score(row.tolist()), expected[i], decimal = 12)
+
+            assert_almost_equal(scorer.score(tuple(row)), expected[i], decimal = 12)
+
+            assert_almost_equal(scorer.score(row), expected[i], decimal = 12)
+
+            assert_almost_equal(scorer.score(dict(zip(names, row))), expected[i], decimal = 12)
+
+
+
+def test_score_extreme_values():
+    """Test single row scores are 0 or 1 without overflow for large linear predictors."""
+
+    scorer = Scorer(intercept = 0, coefficients = [1.0])
+
+    assert scorer.score([1000]) == 1
+
+    assert scorer.score([-1000]) == 0
+
+
+def test_score_row_length_error():
+    """Test an exception is raised if a row has the wrong number of values."""
+
+    scorer = Scorer(intercept = 0, coefficients = [1.0, 2.0])
+
+    with pytest.raises(ValueError):
+
+        scorer.score([1.0])
+
+
+@pytest.mark.parametrize("file_name", ['model.npz', 'model.json', 'model'])
+def test_save_load_round_trip(tmp_path, file_name):
+    """Test a saved and loaded model gives the same predictions and keeps names and standardisation statistics."""
+
+    adult = ad.data.get_data()
+    X, y = ad.data.data_to_np(adult)
+
+    model = LogisticRegression(solver = 'newton').fit(X, y)
+
+    names = ['age', 'fnlwgt', 'education_num', 'capital_gain', 'capital_loss', 'hours_per_week']
+
+    model.save(tmp_path / file_name, names = names)
+
+    scorer = load(tmp_path / file_name)
+
+    assert scorer.names == names
+
+    assert_almost_equal(scorer.x_mean, model.x_mean, decimal = 12)
+
+    assert_almost_equal(scorer.x_scale, model.x_scale, decimal = 12)
+
+    assert_almost_equal(scorer.predict_proba(X), model.predict_proba(X)[:, 0], decimal = 12)
@@ -0,0 +1,163 @@
+import pandas as pd
+import numpy as np
+
+from numpy.testing import assert_array_equal
+
+from adiscriminator import data
+
+
+
+def make_source(path, m = 20):
+    """Function to write a small file in the format of the uci adult.data file."""
+
+    rng = np.random.default_rng(0)
+
+    lines = []
+
+    for i in range(m + 1):
+
+        numbers = rng.integers(0, 100, size = 6)
+
+        lines.append(
+            f'{numbers[0]}, Private, {numbers[1]}, Bachelors, {numbers[2]}, Never-married, Sales, '
+            f'Husband, White, {["Male", "Female"][i % 2]}, {numbers[3]}, {numbers[4]}, {numbers[5]}, '
+            f'United-States, {[" <=50K", " >50K"][i % 3 == 0]}'
+        )
+
+    path.write_text('\n'.join(lines) + '\n')
+
+    return path
+
+
+def test_cache_round_trip(tmp_path):
+    """Test data loaded from the cache is the same as the data read from the source."""
+
+    source = make_source(tmp_path / 'adult.data')
+
+    expected = data.read_source(source)
+
+    first = data.get_data(cache_dir = tmp_path / 'cache', source = source)
+
+    # the second call loads from the cache, the source is not needed
+    second = data.get_data(cache_dir = tmp_path / 'cache')
+
+    for loaded in [first, second]:
+
+        assert list(loaded.columns) == data.adult_columns
+
+        assert_array_equal(loaded.astype(object).to_numpy(), expected.astype(object).to_numpy())
+
+
+def test_cache_rebuilt_for_new_source(tmp_path):
+    """Test the cache is rebuilt when a different or changed source is given."""
+
+    first_source = make_source(tmp_path / 'first.data', m = 20)
+
+    second_source = make_source(tmp_path / 'second.data', m = 30)
+
+    assert len(data.get_data(cache_dir = tmp_path / 'cache', source = first_source)) == 20
+
+    assert len(data.get_data(cache_dir = tmp_path / 'cache', source = second_source)) == 30
+
+    make_source(second_source, m = 40)
+
+    assert len(data.get_data(cache_dir = tmp_path / 'cache', source = second_source)) == 40
+
+    # without a source the existing cache is used
+    assert len(data.get_data(cache_dir = tmp_path / 'cache')) == 40
+
+
+def test_working_directory_not_read(tmp_path, monkeypatch):
+    """Test a pickle in the working directory is not used in place of the given source."""
+
+    source = make_source(tmp_path / 'adult.data', m = 20)
+
+    data.read_source(make_source(tmp_path / 'other.data', m = 30)).to_pickle(tmp_path / 'adult.pkl')
+
+    monkeypatch.chdir(tmp_path)
+
+    assert len(data.read_source(source)) == 20
+
+    assert len(data.get_data(cache_dir = tmp_path / 'cache', source = source)) == 20
+
+
+def test_column_projection(tmp_path):
+    """Test only the requested columns are loaded and arrays are memory-mapped."""
+
+    source = make_source(tmp_path / 'adult.data')
+
+    columns = data.numeric_columns + ['income']
+
+    arrays = data.get_arrays(columns, cache_dir = tmp_path / 'cache', source = source)
+
+    assert list(arrays) == columns
+
+    assert all(isinstance(array, np.memmap) for array in arrays.values())
+
+    X, y = data.data_to_np(arrays)
+
+    X_expected, y_expected = data.data_to_np(data.read_source(source))
+
+    assert_array_equal(X, X_expected)
+
+    assert_array_equal(y, y_expected)
+
+
+def test_categorical_codes(tmp_path):
+    """Test string columns are stored as codes into the categories."""
+
+    source = make_source(tmp_path / 'adult.data')
+
+    sex = data.get_arrays(['sex'], cache_dir = tmp_path / 'cache', source = source)['sex']
+
+    categories = data.get_categories(cache_dir = tmp_path / 'cache')['sex']
+
+    assert_array_equal(np.array(categories)[sex], data.read_source(source)['sex'].to_numpy(dtype = object))
+
+
+def test_data_to_sparse_equal_to_dummies(tmp_path):
+    """Test the sparse design matrix is the numeric columns and a one-hot encoding without the first level."""
+
+    adult = data.read_source(make_source(tmp_path / 'adult.data'))
+
+    X, y, group, vocabularies = data.data_to_sparse(adult, group_columns = ['sex'])
+
+    assert 'sex' not in vocabularies
+
+    dummies = pd.get_dummies(adult[list(vocabularies)], drop_first = True, dtype = float)
+
+    expected = np.hstack([adult[data.numeric_columns].to_numpy(dtype = float), dummies.to_numpy()])
+
+    assert_array_equal(X.toarray(), expected)
+
+    assert X.format == 'csr'
+
+    assert len(data.sparse_feature_names(vocabularies)) == X.shape[1]
+
+    assert_array_equal(y, adult['income'].to_numpy())
+
+    assert_array_equal(group, adult['sex'].to_numpy(dtype = object))
+
+
+def test_data_to_sparse_reuses_vocabularies(tmp_path):
+    """Test new data encoded with saved vocabularies has the same columns, with unseen values as the reference level."""
+
+    adult = data.read_source(make_source(tmp_path / 'adult.data'))
+
+    X, _, _, vocabularies = data.data_to_sparse(adult, group_columns = ['sex', 'race'])
+
+    data.save_vocabularies(vocabularies, tmp_path / 'vocabularies.json')
+
+    new = adult.iloc[:3].drop(columns = 'income').copy()
+
+    new['workclass'] = ' Never-seen'
+
+    X_new, y_new, group_new, _ = data.data_to_sparse(new, data.load_vocabularies(tmp_path / 'vocabularies.json'), group_columns = ['sex', 'race'])
+
+    assert X_new.shape == (3, X.shape[1])
+
+    assert y_new is None
+
+    assert group_new.shape == (3, 2)
+
+    assert_array_equal(X_new[:, :len(data.numeric_columns)].toarray(), X[:3, :len(data.numeric_columns)].toarray())
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        'import adiscriminator',
+        'import adiscriminator.logistic_regression',
+        'from adiscriminator.logistic_regression.scoring import Scorer, load',
+        'from adiscriminator.logistic_regression.base import LogisticRegression',
+        'from adiscriminator.logistic_regression.fair import GroupMeanEqualisingRegression',
+        'from adiscriminator import data'
+    ]
+)
+def test_import_only_numpy(statement):
+    """Test that importing the package or scoring does not import pandas, scipy or sklearn."""
+
+    code = (
+        f'import sys; {statement}; '
+        "print(' '.join(m for m in ['pandas', 'scipy', 'sklearn'] if m in sys.modules))"
+    )
+
+    imported = subprocess.run([sys.executable, '-c', code], capture_output = True, text = True, check = True).stdout.split()
+
+    assert imported == []
+
+
+def test_submodule_attribute_access():
+    """Test that submodules are imported when accessed as attributes of the package."""
+
+    import adiscriminator as ad
+
+    assert ad.logistic_regression.ridge.RidgeRegression.__name__ == 'RidgeRegression'
+
+    with pytest.raises(AttributeError):
+
+        ad.not_a_module